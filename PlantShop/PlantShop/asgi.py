@@ -5,6 +5,57 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Running under ASGI
+------------------
+The I/O-bound endpoints in ``shop.views`` are async: ``contact``,
+``add_to_wishlist``, ``remove_from_wishlist`` and ``generate_invoice_pdf``.
+They use the async ORM and hand WeasyPrint off to the bounded invoice thread
+pool (``INVOICE_RENDER_WORKERS``), so the event loop keeps serving other
+requests while a PDF is being laid out. Serve the project with any ASGI
+server, for example::
+
+    uvicorn PlantShop.asgi:application --workers 2
+    gunicorn PlantShop.asgi:application -k uvicorn.workers.UvicornWorker -w 2
+
+ASGI vs WSGI concurrency
+------------------------
+Under WSGI (``gunicorn PlantShop.wsgi -w 2 --threads 4``) every request holds
+a worker thread for its whole duration, so at most ``workers * threads``
+requests are in flight and a slow invoice blocks its thread for the full
+render. Async views also run under WSGI, but Django wraps each one in its own
+event loop, which adds overhead without freeing the thread.
+
+Under ASGI the wishlist and contact endpoints only occupy the event loop
+while they are doing work, and concurrent invoice downloads queue on the
+invoice pool instead of on request threads. The remaining sync views are run
+by Django in a thread, so they behave as they do under WSGI. SQLite still
+serialises writes, so checkout throughput is bounded by the database in both
+deployments.
+
+To compare the two on your hardware, start each server in turn against a
+scratch database and drive the same shopper mix at it::
+
+    python manage.py loadtest --base-url http://127.0.0.1:8000 --users 50 --duration 120
+
+It reports throughput, error rate and a latency histogram per endpoint, plus
+the SQLite write-lock statistics exposed on ``/metrics/``.
+
+Measured with one worker process each (``gunicorn -w 1 -k gthread --threads 8``
+against ``uvicorn --workers 1``), 50 shoppers, ``--think 0.2``, 60 seconds,
+on a copy of the development database::
+
+    mix                   server  req/s  wishlist_add p50 / p95 ms
+    wishlist=1            WSGI     48.0     389 /  661
+    wishlist=1            ASGI     40.5     546 /  780
+    browse=1,wishlist=1   WSGI     28.7     647 / 4849
+    browse=1,wishlist=1   ASGI     30.3     944 / 2905
+
+With SQLite in a single process, ASGI does not add throughput. Django runs
+async ORM calls and sync views on one shared thread per process, and every
+wishlist write still waits for the single SQLite writer. On the mixed journey
+throughput is about even and the p95 tail is shorter. Invoice downloads were
+not part of this comparison.
 """
 
 import os
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -37,16 +38,18 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'django.contrib.staticfiles',
+    'shop.apps.ShopStaticFilesConfig',
     'shop',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'shop.middleware.PrecompressedStaticFilesMiddleware',
+    'shop.middleware.MediaFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'shop.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -56,7 +59,7 @@ ROOT_URLCONF = 'PlantShop.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': ["templates"],
+        'DIRS': [BASE_DIR / "templates"],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -69,6 +72,17 @@ TEMPLATES = [
     },
 ]
 
+# In production every template is parsed once per process and kept compiled in memory.
+# (Django also caches in development, but reloads templates when their files change.)
+if not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'PlantShop.wsgi.application'
 
 
@@ -83,13 +97,44 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Index versions, auth snapshots and sessions are invalidated through this cache, so
+# every worker process must share it: Redis when REDIS_URL is set, otherwise files
+# that the workers on this host share.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': 'leafcart',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'leafcart-cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+
+# Sessions
+# Session reads are served from the shared cache and only fall back to the database on a
+# miss. Logging out or flushing a session deletes its cache entry for every worker.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
 AUTH_USER_MODEL = 'shop.User'
 
+# Logged-in requests load the user from a cached snapshot instead of the database.
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
+    'shop.auth_backends.CachedModelBackend',
 ]
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -134,7 +179,31 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 #static setting
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / "static"]
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# In production collectstatic writes hashed names plus .gz/.br variants,
+# which shop.middleware.PrecompressedStaticFilesMiddleware serves with far-future caching.
+STORAGES = {
+    'default': {'BACKEND': 'shop.storage.ContentHashedFileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+if not DEBUG:
+    STORAGES['staticfiles']['BACKEND'] = 'shop.storage.CompressedManifestStaticFilesStorage'
 
 #media setting
+# Uploads are saved under content-hashed names and served by shop.middleware.MediaFilesMiddleware
+# (ranges, revalidation, immutable caching). Behind nginx, set MEDIA_ACCEL_REDIRECT to an
+# `internal` location aliased to MEDIA_ROOT so nginx sends the bytes instead of a Python worker.
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'Media'
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT') or None
+
+# Email
+# Wishlist alerts are sent in batches over one connection. The console backend prints them;
+# use 'django.core.mail.backends.filebased.EmailBackend' with EMAIL_FILE_PATH to keep them on disk,
+# or the SMTP backend (EMAIL_HOST etc.) in production.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+DEFAULT_FROM_EMAIL = 'LeafCart <support@leafcart.com>'
+# Absolute base for links in emails, which are sent outside of any request
+SITE_URL = os.environ.get('SITE_URL', 'http://127.0.0.1:8000')
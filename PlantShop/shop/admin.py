@@ -1,11 +1,19 @@
 # ===================================================================
 # IMPORTS
 # ===================================================================
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
 from .models import (
     User, Category, Product, ProductImage, CartItem, Order, OrderItem, 
-    Review, Contact, Wishlist, Coupon
+    Review, Contact, Wishlist, Coupon, ProductRecommendation, OrderStatusEvent,
+    ArchivedOrder, ArchivedOrderItem, ProductAlert
 )
+from .invoices import invoice_orders, get_invoice_renderer
+from .reviews import schedule_aggregate_refresh
+from .order_status import validate_transition, record_status_event, transition_orders
 
 # ===================================================================
 # ADMIN CONFIGURATIONS
@@ -42,15 +50,126 @@ class OrderItemInline(admin.TabularInline):
     can_delete = False
     extra = 0
 
+class OrderStatusEventInline(admin.TabularInline):
+    model = OrderStatusEvent
+    fields = ['created_at', 'from_status', 'to_status', 'changed_by']
+    readonly_fields = fields
+    can_delete = False
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+class OrderAdminForm(forms.ModelForm):
+    class Meta:
+        model = Order
+        fields = '__all__'
+
+    def clean_status(self):
+        status = self.cleaned_data['status']
+        if self.instance.pk:
+            validate_transition(self.instance.status, status)
+        return status
+
+def make_transition_action(to_status):
+    """Builds an admin action that moves the selected orders to `to_status` in one UPDATE."""
+    def action(modeladmin, request, queryset):
+        changed, skipped = transition_orders(queryset, to_status, user=request.user)
+        modeladmin.message_user(request, f"{changed} order(s) marked {to_status}.")
+        if skipped:
+            modeladmin.message_user(request, f"{skipped} order(s) skipped: they cannot move to {to_status}.", messages.WARNING)
+    action.__name__ = f'mark_{to_status.lower()}'
+    return admin.action(description=f"Mark selected orders as {to_status}")(action)
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     """
     Customizes the admin interface for the Order model.
+    Status edits are checked against the order state machine and logged to the status timeline.
     """
+    form = OrderAdminForm
     list_display = ['id', 'user', 'full_name', 'status', 'created_at', 'total_price']
     list_filter = ['status', 'created_at']
     search_fields = ['id', 'full_name', 'email']
-    inlines = [OrderItemInline]
+    readonly_fields = ['status_changed_at']
+    inlines = [OrderItemInline, OrderStatusEventInline]
+    actions = [
+        make_transition_action('Processing'), make_transition_action('Shipped'),
+        make_transition_action('Delivered'), make_transition_action('Cancelled'),
+        'download_invoices_pdf', 'download_invoices_zip',
+    ]
+
+    def save_model(self, request, obj, form, change):
+        status_changed = change and 'status' in form.changed_data
+        if status_changed:
+            obj.status_changed_at = timezone.now()
+        super().save_model(request, obj, form, change)
+        if status_changed:
+            record_status_event(obj, form.initial['status'], user=request.user)
+
+    @admin.action(description="Download invoices as one PDF")
+    def download_invoices_pdf(self, request, queryset):
+        orders = invoice_orders().filter(pk__in=queryset.values('pk')).order_by('id')
+        response = HttpResponse(get_invoice_renderer().render_combined(orders), content_type='application/pdf')
+        response['Content-Disposition'] = 'attachment; filename="invoices.pdf"'
+        return response
+
+    @admin.action(description="Download invoices as a zip of PDFs")
+    def download_invoices_zip(self, request, queryset):
+        orders = invoice_orders().filter(pk__in=queryset.values('pk')).order_by('id')
+        response = HttpResponse(get_invoice_renderer().render_zip(orders), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="invoices.zip"'
+        return response
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    readonly_fields = ['product', 'quantity', 'price']
+    can_delete = False
+    extra = 0
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    """
+    Read-only view of orders moved out of the Order table by `manage.py data_lifecycle`.
+    """
+    list_display = ['id', 'user', 'full_name', 'status', 'created_at', 'total_price', 'archived_at']
+    list_filter = ['status']
+    search_fields = ['id', 'full_name', 'email']
+    raw_id_fields = ['user']
+    inlines = [ArchivedOrderItemInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    """
+    Moderation queue for reviews. Bulk actions run as a single UPDATE, so the
+    affected products' rating aggregates are refreshed explicitly afterwards.
+    """
+    list_display = ['product', 'user', 'rating', 'is_approved', 'created_at']
+    list_filter = ['is_approved', 'rating', 'created_at']
+    search_fields = ['product__name', 'user__email', 'user__full_name', 'comment']
+    list_select_related = ['product', 'user']
+    raw_id_fields = ['product', 'user']
+    actions = ['approve_reviews', 'hide_reviews']
+
+    def _set_approved(self, queryset, approved):
+        product_ids = set(queryset.values_list('product_id', flat=True))
+        queryset.update(is_approved=approved)
+        for product_id in product_ids:
+            transaction.on_commit(lambda product_id=product_id: schedule_aggregate_refresh(product_id))
+
+    @admin.action(description="Approve selected reviews")
+    def approve_reviews(self, request, queryset):
+        self._set_approved(queryset, True)
+
+    @admin.action(description="Hide selected reviews")
+    def hide_reviews(self, request, queryset):
+        self._set_approved(queryset, False)
 
 # ===================================================================
 # STANDARD MODEL REGISTRATIONS
@@ -59,7 +178,8 @@ class OrderAdmin(admin.ModelAdmin):
 # For models that don't need special customization, we can register them directly.
 admin.site.register(User)
 admin.site.register(CartItem)
-admin.site.register(Review)
 admin.site.register(Contact)
 admin.site.register(Wishlist)
-admin.site.register(Coupon)
\ No newline at end of file
+admin.site.register(Coupon)
+admin.site.register(ProductRecommendation)
+admin.site.register(ProductAlert)
\ No newline at end of file
@@ -0,0 +1,116 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.files.storage import default_storage
+
+from .cache_versions import bump_version, get_version
+from .models import Product, ProductImage
+
+try:
+    import orjson
+except ImportError:  # The standard library encoder is used when orjson is not installed
+    orjson = None
+
+
+# ===================================================================
+# PRODUCT PROJECTIONS
+# ===================================================================
+# The API reads rows with values() and encodes them directly, so no model
+# instances are built. Clients pick columns with ?fields=; only whitelisted
+# names map to ORM lookups.
+
+API_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'description': 'description',
+    'price': 'price',
+    'stock': 'stock',
+    'is_available': 'is_available',
+    'is_bestseller': 'is_bestseller',
+    'category_id': 'category_id',
+    'category': 'category__name',
+    'rating_average': 'rating_average',
+    'rating_count': 'rating_count',
+    'created_at': 'created_at',
+}
+# Computed after the row query: image URLs take one extra query per page
+EXTRA_FIELDS = ('images',)
+
+LIST_FIELDS = ('id', 'name', 'price', 'category', 'stock', 'is_available', 'rating_average', 'rating_count', 'images')
+DETAIL_FIELDS = tuple(API_FIELDS) + EXTRA_FIELDS
+
+CATALOG_VERSION_KEY = 'catalog_api_version'
+
+
+def parse_fields(raw, default):
+    """Returns the requested field names, in order, or None if any name is unknown."""
+    if not raw:
+        return list(default)
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    if any(name not in API_FIELDS and name not in EXTRA_FIELDS for name in fields):
+        return None
+    return list(dict.fromkeys(fields))
+
+
+def product_rows(queryset, fields, url_base=''):
+    """
+    Returns product dicts for `queryset` with only `fields`. Image URLs, when requested,
+    are read for the whole batch with one values_list query and prefixed with `url_base`.
+    """
+    lookups = [API_FIELDS[name] for name in fields if name in API_FIELDS and name != 'id']
+    rows = list(queryset.values('id', *lookups))
+    images = image_urls([row['id'] for row in rows], url_base) if 'images' in fields else {}
+    # Rebuilt in the requested order, with public names in place of ORM lookups
+    return [
+        {name: images.get(row['id'], []) if name == 'images' else row[API_FIELDS[name]] for name in fields}
+        for row in rows
+    ]
+
+
+def image_urls(product_ids, url_base=''):
+    """Returns {product_id: [image url, ...]} for the given products with one query."""
+    urls = {}
+    for product_id, name in ProductImage.objects.filter(product_id__in=product_ids).order_by('id').values_list('product_id', 'image'):
+        url = default_storage.url(name)
+        urls.setdefault(product_id, []).append(url_base + url if url.startswith('/') else url)
+    return urls
+
+
+# ===================================================================
+# ENCODING & CACHE VALIDATORS
+# ===================================================================
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """Encodes `data` to compact UTF-8 JSON bytes. Decimals become strings to keep prices exact."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, default=_default, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def get_catalog_version():
+    """
+    The catalog version shared by every worker. It starts from a random value, so a version lost
+    with the cache never reissues an ETag that a client may still hold for older data.
+    """
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def invalidate_catalog_api():
+    """Changes the ETag of every catalog API response after a product, image or category change."""
+    bump_version(CATALOG_VERSION_KEY)
+
+
+def available_products():
+    return Product.objects.filter(is_available=True, category__is_active=True)
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.contrib.staticfiles.apps import StaticFilesConfig
 
 # App Config
 class ShopConfig(AppConfig):
+    # Picked for 'shop' in INSTALLED_APPS; this module also defines the static files config
+    default = True
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'shop'
+
+    def ready(self):
+        # Connects the model signal receivers
+        from . import signals  # noqa: F401
+
+
+# Static Files Config
+class ShopStaticFilesConfig(StaticFilesConfig):
+    """Keeps sass sources, the legacy PHP theme and unused font files out of collectstatic."""
+    ignore_patterns = StaticFilesConfig.ignore_patterns + [
+        '.sass-cache', 'scss', '*.scss', '*.map', 'project', '*.php', 'NotoSans*', 'OFL.txt', 'README.txt',
+    ]
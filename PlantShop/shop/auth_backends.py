@@ -0,0 +1,83 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import User
+
+
+# ===================================================================
+# CACHED USER SNAPSHOTS
+# ===================================================================
+# AuthenticationMiddleware loads the user row on every request, and staff
+# pages add a user-permission and a group-permission query on top. This
+# backend keeps a small snapshot of the user (the fields pages read, the
+# session hash and the permission sets) in the cache, so a logged-in page
+# view does no auth queries until the user changes. The snapshot builds a
+# User with the remaining fields deferred: reading one (e.g. the password
+# when it is being changed) loads it, and save() only writes loaded fields.
+#
+# Snapshots live in the shared cache, so a save in one worker drops them for
+# all. Changes that skip signals (QuerySet.update(), raw SQL) are picked up
+# when the snapshot expires, so the timeout is kept short.
+
+# In model field order, as Model.from_db() expects
+SNAPSHOT_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in {'id', 'email', 'full_name', 'phone', 'is_staff', 'is_superuser', 'is_active'}
+)
+SNAPSHOT_TIMEOUT = getattr(settings, 'AUTH_USER_SNAPSHOT_TIMEOUT', 60 * 5)
+BACKEND_PATH = 'shop.auth_backends.CachedModelBackend'
+
+
+def snapshot_key(user_id):
+    return f'auth_user_snapshot:{user_id}'
+
+
+def invalidate_user_snapshot(*user_ids):
+    """
+    Drops the users' snapshots now and again once the transaction commits, as a request in
+    another worker can rebuild one from the old rows in between.
+    """
+    keys = [snapshot_key(user_id) for user_id in user_ids]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose get_user() and aget_user() are served from a cached user snapshot."""
+
+    def get_user(self, user_id):
+        snapshot = cache.get(snapshot_key(user_id))
+        if snapshot is None:
+            try:
+                user = User._default_manager.get(pk=user_id)
+            except User.DoesNotExist:
+                return None
+            snapshot = self._build_snapshot(user)
+            cache.set(snapshot_key(user_id), snapshot, SNAPSHOT_TIMEOUT)
+        user = User.from_db(User._default_manager.db, SNAPSHOT_FIELDS, snapshot['values'])
+        user._session_auth_hash = snapshot['session_hash']
+        user._has_usable_password = snapshot['usable_password']
+        user._user_perm_cache = snapshot['user_perms']
+        user._group_perm_cache = snapshot['group_perms']
+        user._perm_cache = snapshot['user_perms'] | snapshot['group_perms']
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        # request.auser() in async views lands here; ModelBackend's version would query the row
+        return await sync_to_async(self.get_user)(user_id)
+
+    def _build_snapshot(self, user):
+        return {
+            'values': tuple(getattr(user, field) for field in SNAPSHOT_FIELDS),
+            'session_hash': user.get_session_auth_hash(),
+            'usable_password': user.has_usable_password(),
+            'user_perms': frozenset(self.get_user_permissions(user)),
+            'group_perms': frozenset(self.get_group_permissions(user)),
+        }
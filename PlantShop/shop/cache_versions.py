@@ -0,0 +1,38 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import secrets
+
+from django.core.cache import cache
+
+
+# ===================================================================
+# SHARED VERSION COUNTERS
+# ===================================================================
+# Each worker keeps in-memory catalog indexes (facets, stock, suggestions,
+# catalog API) and checks them against a counter in the shared cache, which
+# every worker process reads. A change bumps the counter and every worker
+# rebuilds on its next lookup. Counters start from a random value, so a
+# counter lost to a flush, an eviction or a new cache server never repeats a
+# value that a worker or an HTTP client (through an ETag) has already seen.
+
+def _seed():
+    return secrets.randbits(48)
+
+
+def get_version(key):
+    """Returns the current value of the shared counter `key`, seeding it on first use."""
+    return cache.get_or_set(key, _seed, None)
+
+
+def bump_version(key):
+    """Moves the shared counter `key` on and returns its new value."""
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        version = _seed()
+        cache.set(key, version, None)
+        return version
+    # Backends without a native incr re-set the key with the default timeout
+    cache.touch(key, None)
+    return version
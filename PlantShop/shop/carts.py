@@ -0,0 +1,33 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from django.core.cache import cache
+from django.db.models import Sum
+
+from .models import CartItem
+
+
+# ===================================================================
+# CACHED CART ITEM COUNT
+# ===================================================================
+# The header cart badge is on every page. The count is cached per user, not
+# per session, and dropped by the CartItem signals, so a change from another
+# device, the admin or the stale cart purge shows up on the next page.
+
+CART_COUNT_CACHE_TIMEOUT = 60 * 60
+
+
+def _cart_count_key(user_id):
+    return f'cart_count:{user_id}'
+
+
+def get_cart_count(user_id):
+    """Returns the number of items in the user's cart."""
+    def compute():
+        return CartItem.objects.filter(user_id=user_id).aggregate(total=Sum('quantity'))['total'] or 0
+    return cache.get_or_set(_cart_count_key(user_id), compute, CART_COUNT_CACHE_TIMEOUT)
+
+
+def invalidate_cart_count(user_id):
+    """Drops the cached count so the next read recomputes it."""
+    cache.delete(_cart_count_key(user_id))
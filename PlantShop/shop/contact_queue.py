@@ -0,0 +1,44 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from django.conf import settings
+
+from .models import Contact
+from .ratelimit import TokenBucketLimiter
+from .workers import BatchWorker
+from . import metrics
+
+
+# ===================================================================
+# CONTACT FORM INGESTION
+# ===================================================================
+
+CONTACT_BATCH_SIZE = getattr(settings, 'CONTACT_BATCH_SIZE', 50)
+CONTACT_FLUSH_INTERVAL = getattr(settings, 'CONTACT_FLUSH_INTERVAL', 2.0)
+
+# Bursts of 5 messages, then one every 2 minutes per IP; one every 10 minutes per email.
+ip_limiter = TokenBucketLimiter('contact-ip', capacity=5, refill_rate=1 / 120)
+email_limiter = TokenBucketLimiter('contact-email', capacity=3, refill_rate=1 / 600)
+
+
+def _write_contacts(batch):
+    Contact.objects.bulk_create(batch, batch_size=CONTACT_BATCH_SIZE)
+
+
+contact_worker = BatchWorker(
+    'contact-writer', _write_contacts,
+    batch_size=CONTACT_BATCH_SIZE, flush_interval=CONTACT_FLUSH_INTERVAL, max_queue_size=5000,
+)
+metrics.register_gauge('leafcart_contact_queue_depth', "Contact messages waiting to be written.", lambda: contact_worker.depth)
+
+
+def is_rate_limited(ip, email):
+    """Checks both the per-IP and per-email buckets. Both are charged so spammers can't alternate."""
+    ip_allowed = ip_limiter.allow(ip)
+    email_allowed = email_limiter.allow(email.strip().lower())
+    return not (ip_allowed and email_allowed)
+
+
+def enqueue_contact(name, email, subject, message):
+    """Queues a contact message for the background writer. Returns False if the queue is full."""
+    return contact_worker.put(Contact(name=name, email=email, subject=subject, message=message))
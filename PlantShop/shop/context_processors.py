@@ -1,4 +1,5 @@
-from .models import CartItem, Product
+from .models import Product
+from .carts import get_cart_count
 
 def cart_item_count(request):
     """
@@ -6,16 +7,14 @@ def cart_item_count(request):
     """
     context = {}
     
-    # Calculate cart item count for authenticated users
+    # Cart item count for authenticated users, cached per user until their cart changes
     if request.user.is_authenticated:
-        cart_items = CartItem.objects.filter(user=request.user)
-        total_items = sum(item.quantity for item in cart_items)
-        context['cart_item_count'] = total_items
+        context['cart_item_count'] = get_cart_count(request.user.id)
     else:
         context['cart_item_count'] = 0
 
     # Fetch the top 2 bestseller products
-    bestseller_products = Product.objects.filter(is_bestseller=True, is_available=True)[:2]
+    bestseller_products = Product.objects.filter(is_bestseller=True, is_available=True).prefetch_related('images')[:2]
     context['bestseller_products'] = bestseller_products
     
     return context
\ No newline at end of file
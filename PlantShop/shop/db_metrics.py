@@ -0,0 +1,47 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import time
+
+from django.conf import settings
+from django.db import OperationalError
+
+from . import metrics
+
+
+# ===================================================================
+# SQLITE WRITE-LOCK STATISTICS
+# ===================================================================
+# SQLite allows one writer at a time; a write that finds the database locked
+# waits (up to the busy timeout) inside the statement itself. Timing write
+# statements therefore measures lock waits, and "database is locked" errors
+# count the writes that gave up. Exposed through /metrics/ so the load
+# generator can report them per run.
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+SLOW_WRITE_SECONDS = getattr(settings, 'SQLITE_SLOW_WRITE_SECONDS', 0.05)
+
+
+def sqlite_write_timer(execute, sql, params, many, context):
+    """Connection execute wrapper that records write statement counts, time and lock errors."""
+    if not sql.lstrip()[:7].upper().startswith(WRITE_PREFIXES):
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    except OperationalError as e:
+        if 'locked' in str(e):
+            metrics.increment('leafcart_sqlite_locked_errors_total', "Writes that failed with 'database is locked'.")
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.increment('leafcart_sqlite_writes_total', "Write statements executed.")
+        metrics.increment('leafcart_sqlite_write_seconds_total', "Time spent in write statements, lock waits included.", elapsed)
+        if elapsed >= SLOW_WRITE_SECONDS:
+            metrics.increment('leafcart_sqlite_slow_writes_total', f"Writes that took at least {SLOW_WRITE_SECONDS}s, mostly lock waits.")
+
+
+def install_sqlite_write_timer(connection):
+    if connection.vendor == 'sqlite' and getattr(settings, 'SQLITE_LOCK_METRICS', True):
+        if sqlite_write_timer not in connection.execute_wrappers:
+            connection.execute_wrappers.append(sqlite_write_timer)
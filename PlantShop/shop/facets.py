@@ -0,0 +1,234 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import threading
+from decimal import Decimal
+from urllib.parse import urlencode
+
+from django.db.models import Q
+
+from .cache_versions import bump_version, get_version
+from .models import Product
+
+
+# ===================================================================
+# FACET DEFINITIONS
+# ===================================================================
+
+# (key, label, lower bound inclusive, upper bound exclusive)
+PRICE_BUCKETS = (
+    ('under-250', 'Under ₹250', None, Decimal('250')),
+    ('250-500', '₹250 - ₹500', Decimal('250'), Decimal('500')),
+    ('500-1000', '₹500 - ₹1000', Decimal('500'), Decimal('1000')),
+    ('1000-plus', '₹1000 & above', Decimal('1000'), None),
+)
+PRICE_BUCKET_KEYS = {key for key, _, _, _ in PRICE_BUCKETS}
+
+FACET_VERSION_KEY = 'facet_index_version'
+
+
+class FacetSelection:
+    """The facet filters chosen on the shop page, parsed from the query string."""
+    def __init__(self, categories=(), prices=(), in_stock=False, bestseller=False):
+        self.categories = list(categories)
+        self.prices = list(prices)
+        self.in_stock = in_stock
+        self.bestseller = bestseller
+
+    @classmethod
+    def from_query(cls, query_dict):
+        return cls(
+            categories=[int(c) for c in query_dict.getlist('categories') if c.isdigit()],
+            prices=[p for p in query_dict.getlist('price') if p in PRICE_BUCKET_KEYS],
+            in_stock=query_dict.get('in_stock') == '1',
+            bestseller=query_dict.get('bestseller') == '1',
+        )
+
+    def query_params(self):
+        """Returns the selection as (name, value) pairs for links and hidden form inputs."""
+        params = [('categories', c) for c in self.categories] + [('price', p) for p in self.prices]
+        if self.in_stock:
+            params.append(('in_stock', '1'))
+        if self.bestseller:
+            params.append(('bestseller', '1'))
+        return params
+
+    def toggled(self, group, value=None):
+        """Returns a copy of the selection with one facet value switched on or off."""
+        copy = FacetSelection(self.categories, self.prices, self.in_stock, self.bestseller)
+        if group in ('categories', 'prices'):
+            values = getattr(copy, group)
+            if value in values:
+                values.remove(value)
+            else:
+                values.append(value)
+        else:
+            setattr(copy, group, not getattr(copy, group))
+        return copy
+
+    def as_q(self):
+        """Returns the selection as an ORM filter for the product listing query."""
+        q = Q()
+        if self.categories:
+            q &= Q(category_id__in=self.categories)
+        if self.prices:
+            price_q = Q()
+            for key, _, low, high in PRICE_BUCKETS:
+                if key in self.prices:
+                    bucket = Q()
+                    if low is not None:
+                        bucket &= Q(price__gte=low)
+                    if high is not None:
+                        bucket &= Q(price__lt=high)
+                    price_q |= bucket
+            q &= price_q
+        if self.in_stock:
+            q &= Q(stock__gt=0)
+        if self.bestseller:
+            q &= Q(is_bestseller=True)
+        return q
+
+
+# ===================================================================
+# IN-MEMORY FACET INDEX
+# ===================================================================
+
+class FacetIndex:
+    """
+    Per-facet-value bitmaps over the catalog, stored as Python ints (bit i = i-th product).
+    Counts for any combination of filters are bitwise ANDs plus a popcount, with no SQL.
+    """
+    def __init__(self, rows):
+        self.position = {}
+        category_positions = {}
+        price_positions = {key: [] for key in PRICE_BUCKET_KEYS}
+        in_stock_positions, bestseller_positions = [], []
+        for i, (product_id, category_id, price, stock, is_bestseller) in enumerate(rows):
+            self.position[product_id] = i
+            category_positions.setdefault(category_id, []).append(i)
+            for key, _, low, high in PRICE_BUCKETS:
+                if (low is None or price >= low) and (high is None or price < high):
+                    price_positions[key].append(i)
+                    break
+            if stock > 0:
+                in_stock_positions.append(i)
+            if is_bestseller:
+                bestseller_positions.append(i)
+        self.size = len(self.position)
+        self.all = (1 << self.size) - 1
+        self.by_category = {cid: self.bitmap(positions) for cid, positions in category_positions.items()}
+        self.by_price = {key: self.bitmap(positions) for key, positions in price_positions.items()}
+        self.in_stock = self.bitmap(in_stock_positions)
+        self.bestseller = self.bitmap(bestseller_positions)
+
+    @classmethod
+    def build(cls):
+        return cls(Product.objects.values_list('id', 'category_id', 'price', 'stock', 'is_bestseller').order_by('id'))
+
+    def bitmap(self, positions):
+        """
+        Builds the bitmap with the given bits set. The bits go into a byte buffer that is converted
+        once: OR-ing each bit into a growing int copies the whole int every time, which is quadratic.
+        """
+        buffer = bytearray((self.size + 7) // 8)
+        for i in positions:
+            buffer[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def bitmap_for_ids(self, product_ids):
+        position = self.position
+        return self.bitmap(position[product_id] for product_id in product_ids if product_id in position)
+
+    def _group_bitmaps(self, selection):
+        """Returns the bitmap of products passing each facet group's filter (all products if unset)."""
+        categories = self.all
+        if selection.categories:
+            categories = 0
+            for category_id in selection.categories:
+                categories |= self.by_category.get(category_id, 0)
+        prices = self.all
+        if selection.prices:
+            prices = 0
+            for key in selection.prices:
+                prices |= self.by_price[key]
+        return {
+            'categories': categories,
+            'prices': prices,
+            'in_stock': self.in_stock if selection.in_stock else self.all,
+            'bestseller': self.bestseller if selection.bestseller else self.all,
+        }
+
+    def counts(self, selection, base=None):
+        """
+        Returns live counts for every facet value. Each group is counted against the other
+        groups' filters (and the search `base`), so selecting a value never hides its siblings.
+        """
+        base = self.all if base is None else base
+        groups = self._group_bitmaps(selection)
+
+        def others(group):
+            bitmap = base
+            for name, group_bitmap in groups.items():
+                if name != group:
+                    bitmap &= group_bitmap
+            return bitmap
+
+        category_base, price_base = others('categories'), others('prices')
+        return {
+            'categories': {cid: (bitmap & category_base).bit_count() for cid, bitmap in self.by_category.items()},
+            'prices': {key: (bitmap & price_base).bit_count() for key, bitmap in self.by_price.items()},
+            'in_stock': (self.in_stock & others('in_stock')).bit_count(),
+            'bestseller': (self.bestseller & others('bestseller')).bit_count(),
+            'total': (others(None)).bit_count(),
+        }
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_facet_index():
+    """Returns the process-wide facet index, rebuilding it if a Product change bumped the version."""
+    global _index, _index_version
+    version = get_version(FACET_VERSION_KEY)
+    if _index is None or _index_version != version:
+        with _index_lock:
+            if _index is None or _index_version != version:
+                _index, _index_version = FacetIndex.build(), version
+    return _index
+
+
+def invalidate_facet_index():
+    """Marks every worker's facet index stale; each rebuilds on its next shop request."""
+    bump_version(FACET_VERSION_KEY)
+
+
+def build_facets(selection, categories, search_ids=None, extra_params=()):
+    """
+    Returns the sidebar facet groups for the shop template and the total matching product count.
+    `search_ids` restricts the counts to the current search results when a search is active;
+    `extra_params` (search, sort) are carried over into every facet link.
+    """
+    index = get_facet_index()
+    base = index.bitmap_for_ids(search_ids) if search_ids is not None else None
+    counts = index.counts(selection, base=base)
+
+    def option(label, count, active, toggled):
+        return {'label': label, 'count': count, 'active': active, 'url': '?' + urlencode(list(extra_params) + toggled.query_params())}
+
+    facets = {
+        'categories': [
+            option(c.name, counts['categories'].get(c.id, 0), c.id in selection.categories, selection.toggled('categories', c.id))
+            for c in categories
+        ],
+        'prices': [
+            option(label, counts['prices'][key], key in selection.prices, selection.toggled('prices', key))
+            for key, label, _, _ in PRICE_BUCKETS
+        ],
+        'availability': [
+            option('In stock', counts['in_stock'], selection.in_stock, selection.toggled('in_stock')),
+            option('Bestsellers', counts['bestseller'], selection.bestseller, selection.toggled('bestseller')),
+        ],
+    }
+    return facets, counts['total']
@@ -0,0 +1,127 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import threading
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .cache_versions import bump_version, get_version
+from .models import Product
+from .facets import invalidate_facet_index
+from .api import invalidate_catalog_api
+
+
+# ===================================================================
+# STOCK SNAPSHOT
+# ===================================================================
+
+LOW_STOCK_THRESHOLD = getattr(settings, 'LOW_STOCK_THRESHOLD', 5)
+STOCK_VERSION_KEY = 'stock_snapshot_version'
+
+
+class StockLevel(NamedTuple):
+    """Availability of one product as shown on product cards."""
+    available: int
+    in_stock: bool
+    low: bool
+
+
+OUT_OF_STOCK = StockLevel(0, False, False)
+
+
+class StockSnapshot:
+    """
+    Product id -> quantity that can be sold, for the whole catalog. Products switched off
+    with is_available count as zero. Lookups are dict reads, with no SQL.
+    """
+    def __init__(self, rows, low_threshold=LOW_STOCK_THRESHOLD):
+        self.low_threshold = low_threshold
+        self.available = {product_id: stock if is_available else 0 for product_id, stock, is_available in rows}
+
+    @classmethod
+    def build(cls):
+        return cls(Product.objects.values_list('id', 'stock', 'is_available'))
+
+    def quantity(self, product_id):
+        return self.available.get(product_id, 0)
+
+    def can_fulfil(self, product_id, quantity):
+        return 0 < quantity <= self.quantity(product_id)
+
+    def level(self, product_id):
+        quantity = self.quantity(product_id)
+        if quantity <= 0:
+            return OUT_OF_STOCK
+        return StockLevel(quantity, True, quantity <= self.low_threshold)
+
+    def low_stock_ids(self):
+        """Ids of products that are in stock but at or below the low-stock threshold."""
+        return [pid for pid, quantity in self.available.items() if 0 < quantity <= self.low_threshold]
+
+
+_snapshot = None
+_snapshot_version = None
+_snapshot_lock = threading.Lock()
+
+
+def get_stock_snapshot():
+    """Returns the process-wide stock snapshot, rebuilding it if a Product change bumped the version."""
+    global _snapshot, _snapshot_version
+    version = get_version(STOCK_VERSION_KEY)
+    if _snapshot is None or _snapshot_version != version:
+        with _snapshot_lock:
+            if _snapshot is None or _snapshot_version != version:
+                _snapshot, _snapshot_version = StockSnapshot.build(), version
+    return _snapshot
+
+
+def invalidate_stock_snapshot():
+    """Marks every worker's stock snapshot stale; each rebuilds on its next lookup."""
+    bump_version(STOCK_VERSION_KEY)
+
+
+def stock_level(product_id):
+    return get_stock_snapshot().level(product_id)
+
+
+def available_quantity(product_id, wanted=1):
+    """
+    Returns the quantity of a product that can be sold, from the snapshot. When the snapshot has
+    fewer than `wanted`, the product row is read instead: a restock committed a moment ago may not
+    have reached this worker's snapshot yet, and a buyer should not be turned away on stale data.
+    """
+    quantity = get_stock_snapshot().quantity(product_id)
+    if quantity >= wanted:
+        return quantity
+    row = Product.objects.filter(id=product_id).values_list('stock', 'is_available').first()
+    return row[0] if row and row[1] else 0
+
+
+# ===================================================================
+# STOCK RESERVATION
+# ===================================================================
+
+class InsufficientStock(Exception):
+    """Raised when a product no longer has enough stock for an order line."""
+    def __init__(self, product_id):
+        super().__init__(product_id)
+        self.product_id = product_id
+
+
+def decrement_stock(quantities):
+    """
+    Takes {product_id: quantity} out of stock with one conditional UPDATE per product, so two
+    checkouts cannot oversell. Must run inside a transaction; raises InsufficientStock on the
+    first product that falls short. UPDATEs skip model signals, so the snapshot, facet
+    index and catalog API version are invalidated once the transaction commits.
+    """
+    for product_id, quantity in quantities.items():
+        updated = Product.objects.filter(id=product_id, is_available=True, stock__gte=quantity).update(stock=F('stock') - quantity)
+        if not updated:
+            raise InsufficientStock(product_id)
+    transaction.on_commit(invalidate_stock_snapshot)
+    transaction.on_commit(invalidate_facet_index)
+    transaction.on_commit(invalidate_catalog_api)
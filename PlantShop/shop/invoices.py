@@ -0,0 +1,119 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import asyncio
+import base64
+import io
+import mimetypes
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.db.models import Prefetch
+from django.template.loader import render_to_string
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+
+# ===================================================================
+# INVOICE LOADING
+# ===================================================================
+
+INVOICE_STYLESHEET = 'css/invoice.css'
+INVOICE_LOGO = 'img/core-img/logo.png'
+INVOICE_RENDER_WORKERS = getattr(settings, 'INVOICE_RENDER_WORKERS', 2)
+
+
+def invoice_orders():
+    """Returns an Order queryset that loads all line items and products in one extra query."""
+    return Order.objects.prefetch_related(Prefetch('items', queryset=OrderItem.objects.select_related('product')))
+
+
+def archived_invoice_orders():
+    """The same for archived orders, which render with the same invoice template."""
+    return ArchivedOrder.objects.prefetch_related(Prefetch('items', queryset=ArchivedOrderItem.objects.select_related('product')))
+
+
+# ===================================================================
+# INVOICE RENDERING
+# ===================================================================
+
+class InvoiceRenderer:
+    """
+    Renders invoice PDFs with WeasyPrint, reusing one parsed stylesheet, font configuration
+    and preloaded logo across calls. Static assets are read from local paths, never over HTTP.
+    WeasyPrint is imported on first construction so that workers which never render an
+    invoice don't pay for loading Pango, cairo and font discovery.
+    """
+    def __init__(self):
+        from weasyprint import HTML, CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        self._html_class = HTML
+        self.font_config = FontConfiguration()
+        with open(finders.find(INVOICE_STYLESHEET), encoding='utf-8') as css_file:
+            self.stylesheet = CSS(string=css_file.read(), font_config=self.font_config)
+        self.logo_uri = self._data_uri(finders.find(INVOICE_LOGO))
+        self.base_url = settings.BASE_DIR.as_uri() + '/'
+
+    @staticmethod
+    def _data_uri(path):
+        if not path:
+            return None
+        mime_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        with open(path, 'rb') as asset:
+            return f"data:{mime_type};base64,{base64.b64encode(asset.read()).decode('ascii')}"
+
+    def render_document(self, order):
+        """Lays out a single invoice and returns the WeasyPrint document."""
+        html_string = render_to_string('invoice.html', {'order': order, 'logo_uri': self.logo_uri})
+        return self._html_class(string=html_string, base_url=self.base_url).render(stylesheets=[self.stylesheet], font_config=self.font_config)
+
+    def render(self, order):
+        """Returns the PDF bytes for a single order."""
+        return self.render_document(order).write_pdf()
+
+    def render_combined(self, orders):
+        """Returns one PDF containing the invoices of all given orders, in order."""
+        documents = [self.render_document(order) for order in orders]
+        if not documents:
+            return b''
+        pages = [page for document in documents for page in document.pages]
+        return documents[0].copy(pages).write_pdf()
+
+    def render_zip(self, orders):
+        """Returns a zip archive with one invoice PDF per order."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for order in orders:
+                archive.writestr(invoice_filename(order), self.render(order))
+        return buffer.getvalue()
+
+
+_local = threading.local()
+
+
+def get_invoice_renderer():
+    """Returns this thread's renderer, creating it on first use (font configs are not thread-safe)."""
+    renderer = getattr(_local, 'renderer', None)
+    if renderer is None:
+        renderer = _local.renderer = InvoiceRenderer()
+    return renderer
+
+
+_executor = ThreadPoolExecutor(max_workers=INVOICE_RENDER_WORKERS, thread_name_prefix='invoice-render')
+
+
+async def arender_invoice(order):
+    """
+    Renders an invoice on the bounded invoice thread pool so async views don't block the event loop.
+    The order must already have its items prefetched (see invoice_orders).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: get_invoice_renderer().render(order))
+
+
+def invoice_filename(order):
+    return f"invoice_#{order.id}.pdf"
@@ -0,0 +1,102 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, CartItem, Order, OrderItem, OrderStatusEvent
+from .order_status import ORDER_TRANSITIONS
+
+
+# ===================================================================
+# DATA LIFECYCLE: STALE CARTS AND ORDER ARCHIVAL
+# ===================================================================
+# Both jobs work in bounded batches, each in its own short transaction, so a
+# run never holds SQLite's write lock for long and can be stopped at any point.
+# Run by `manage.py data_lifecycle`, once from cron or as a looping process.
+
+CART_RETENTION_DAYS = getattr(settings, 'CART_RETENTION_DAYS', 30)
+ORDER_ARCHIVE_AFTER_DAYS = getattr(settings, 'ORDER_ARCHIVE_AFTER_DAYS', 365)
+LIFECYCLE_BATCH_SIZE = getattr(settings, 'LIFECYCLE_BATCH_SIZE', 500)
+
+# Only orders that can no longer change status are archived
+ARCHIVABLE_STATUSES = [status for status, targets in ORDER_TRANSITIONS.items() if not targets]
+# Fields copied from Order to ArchivedOrder as-is
+ARCHIVED_ORDER_FIELDS = [
+    field.attname for field in ArchivedOrder._meta.concrete_fields
+    if field.attname not in ('status_history', 'archived_at')
+]
+
+
+def days_ago(days):
+    return timezone.now() - timedelta(days=days)
+
+
+# --- Stale carts ---
+
+def stale_cart_users(cutoff):
+    """Users whose whole cart has been untouched since `cutoff`."""
+    return CartItem.objects.values('user').annotate(last_update=Max('updated_at')).filter(last_update__lt=cutoff).values_list('user', flat=True)
+
+
+def purge_stale_carts(cutoff, batch_size=LIFECYCLE_BATCH_SIZE):
+    """Deletes abandoned carts a batch of users at a time. Returns the number of cart items deleted."""
+    deleted = 0
+    while True:
+        user_ids = list(stale_cart_users(cutoff)[:batch_size])
+        if not user_ids:
+            return deleted
+        # The updated_at filter keeps anything added since the batch was picked
+        count, _ = CartItem.objects.filter(user_id__in=user_ids, updated_at__lt=cutoff).delete()
+        deleted += count
+        if len(user_ids) < batch_size:
+            return deleted
+
+
+# --- Order archival ---
+
+def archivable_orders(cutoff):
+    """Finished orders placed before `cutoff` whose status has not changed since."""
+    return Order.objects.filter(status__in=ARCHIVABLE_STATUSES, created_at__lt=cutoff).exclude(status_changed_at__gte=cutoff)
+
+
+def archive_order_batch(cutoff, batch_size=LIFECYCLE_BATCH_SIZE):
+    """
+    Copies one batch of orders, their line items and status timelines into the archive tables
+    and deletes them from the hot tables, in one transaction. Returns the number archived.
+    """
+    with transaction.atomic():
+        orders = list(archivable_orders(cutoff).select_for_update().order_by('id')[:batch_size])
+        if not orders:
+            return 0
+        order_ids = [order.id for order in orders]
+        history = {}
+        events = OrderStatusEvent.objects.filter(order_id__in=order_ids).order_by('created_at', 'id')
+        for order_id, from_status, to_status, changed_by_id, created_at in events.values_list('order_id', 'from_status', 'to_status', 'changed_by_id', 'created_at'):
+            history.setdefault(order_id, []).append([from_status, to_status, changed_by_id, created_at.isoformat()])
+
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(status_history=history.get(order.id, []), **{field: getattr(order, field) for field in ARCHIVED_ORDER_FIELDS})
+            for order in orders
+        ])
+        ArchivedOrderItem.objects.bulk_create([
+            ArchivedOrderItem(order_id=order_id, product_id=product_id, quantity=quantity, price=price)
+            for order_id, product_id, quantity, price in OrderItem.objects.filter(order_id__in=order_ids).values_list('order_id', 'product_id', 'quantity', 'price')
+        ], batch_size=batch_size)
+        # Cascades to the hot OrderItem and OrderStatusEvent rows
+        Order.objects.filter(id__in=order_ids).delete()
+    return len(orders)
+
+
+def archive_orders(cutoff, batch_size=LIFECYCLE_BATCH_SIZE):
+    """Archives every eligible order, batch by batch. Returns the number archived."""
+    archived = 0
+    while True:
+        count = archive_order_batch(cutoff, batch_size)
+        archived += count
+        if count < batch_size:
+            return archived
@@ -0,0 +1,333 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import asyncio
+import random
+import re
+import time
+from urllib.parse import urlencode, urlsplit
+
+from .sorting import PRODUCT_SORTS
+
+
+# ===================================================================
+# MINIMAL ASYNC HTTP CLIENT
+# ===================================================================
+# A keep-alive HTTP/1.1 client on asyncio streams, so the load generator needs
+# nothing beyond the standard library. It speaks just enough HTTP for a local
+# Django server: Content-Length and chunked bodies, cookies and redirects
+# reported (not followed).
+
+class HTTPResponse:
+    def __init__(self, status, headers, cookies, body):
+        self.status = status
+        self.headers = headers
+        self.cookies = cookies
+        self.body = body
+
+
+class HTTPClient:
+    """One connection and cookie jar, i.e. one browser, against a plain-HTTP base URL."""
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        if parts.scheme != 'http':
+            raise ValueError("The load generator only supports http:// base URLs.")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.cookies = {}
+        self._reader = self._writer = None
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def request(self, method, path, data=None, headers=None):
+        body = urlencode(data).encode() if data is not None else b''
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Accept-Encoding: identity"]
+        if self.cookies:
+            lines.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        if data is not None:
+            lines += ["Content-Type: application/x-www-form-urlencoded", f"Content-Length: {len(body)}"]
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+        # A kept-alive connection may have been closed by the server; retry once on a fresh one
+        for attempt in (1, 2):
+            if self._writer is None:
+                await self._connect()
+            try:
+                self._writer.write(payload)
+                await self._writer.drain()
+                return await asyncio.wait_for(self._read_response(), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt == 2:
+                    raise
+
+    async def _read_response(self):
+        status_line = await self._reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers, cookies = {}, {}
+        while True:
+            line = (await self._reader.readuntil(b"\r\n")).decode('latin-1').rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                cookie_name, _, rest = value.partition("=")
+                cookies[cookie_name] = rest.split(";", 1)[0]
+            headers[name] = value
+
+        if headers.get('transfer-encoding') == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readexactly(2)
+            body = b"".join(chunks)
+        elif 'content-length' in headers:
+            body = await self._reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self._reader.read()
+            headers['connection'] = 'close'
+
+        for cookie_name, value in cookies.items():
+            if value in ('', '""'):
+                self.cookies.pop(cookie_name, None)
+            else:
+                self.cookies[cookie_name] = value
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return HTTPResponse(status, headers, cookies, body)
+
+
+# ===================================================================
+# RESULTS
+# ===================================================================
+
+HISTOGRAM_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class LoadStats:
+    """Latency samples and error counts per endpoint name."""
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+
+    def record(self, endpoint, elapsed_ms, ok):
+        self.samples.setdefault(endpoint, []).append(elapsed_ms)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def histogram(self, endpoint):
+        counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for sample in self.samples[endpoint]:
+            for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+                if sample <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return counts
+
+    def report_lines(self, wall_seconds):
+        lines = [f"{'endpoint':<16} {'reqs':>6} {'req/s':>7} {'err%':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+        total = errors = 0
+        for endpoint in sorted(self.samples):
+            samples = self.samples[endpoint]
+            failed = self.errors.get(endpoint, 0)
+            total += len(samples)
+            errors += failed
+            lines.append(
+                f"{endpoint:<16} {len(samples):>6} {len(samples) / wall_seconds:>7.1f} {failed / len(samples):>6.1%} "
+                f"{percentile(samples, 50):>8.1f} {percentile(samples, 95):>8.1f} {percentile(samples, 99):>8.1f} {max(samples):>8.1f}"
+            )
+        if total:
+            lines.append(f"{'TOTAL':<16} {total:>6} {total / wall_seconds:>7.1f} {errors / total:>6.1%}")
+
+        lines += ["", "Latency histogram (requests per bucket, upper bound in ms):"]
+        headings = [f"<={bound}" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}"]
+        lines.append(f"{'endpoint':<16} " + " ".join(f"{h:>7}" for h in headings))
+        for endpoint in sorted(self.samples):
+            lines.append(f"{endpoint:<16} " + " ".join(f"{count:>7}" for count in self.histogram(endpoint)))
+        return lines
+
+
+# ===================================================================
+# SHOPPER JOURNEYS
+# ===================================================================
+
+ORDER_URL_RE = re.compile(r'/order/confirmation/(\d+)/')
+# Every sort the shop page offers, so new sorts are load tested as soon as they exist
+SORTS = ('default', *PRODUCT_SORTS)
+
+
+class Shopper:
+    """
+    One simulated shopper with its own connection and session. Each journey is a sequence of
+    page loads separated by think time; every request is timed and recorded under an endpoint name.
+    """
+    def __init__(self, base_url, stats, catalog, account, think_seconds):
+        self.client = HTTPClient(base_url)
+        self.stats = stats
+        self.catalog = catalog
+        self.account = account
+        self.think_seconds = think_seconds
+        self.logged_in = False
+
+    async def call(self, endpoint, method, path, data=None, ok_statuses=(200, 302)):
+        headers = {}
+        if method == 'POST' and 'csrftoken' in self.client.cookies:
+            headers['X-CSRFToken'] = self.client.cookies['csrftoken']
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, data=data, headers=headers)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            self.stats.record(endpoint, (time.perf_counter() - start) * 1000, False)
+            return None
+        self.stats.record(endpoint, (time.perf_counter() - start) * 1000, response.status in ok_statuses)
+        return response
+
+    async def think(self):
+        if self.think_seconds:
+            await asyncio.sleep(random.uniform(0, 2 * self.think_seconds))
+
+    async def login(self):
+        if self.logged_in:
+            return True
+        await self.call('login_form', 'GET', '/login/')
+        response = await self.call('login', 'POST', '/login/', {'email': self.account['email'], 'password': self.account['password']}, ok_statuses=(302,))
+        self.logged_in = response is not None and response.status == 302
+        return self.logged_in
+
+    def _shop_query(self):
+        params = {}
+        if self.catalog['category_ids'] and random.random() < 0.5:
+            params['categories'] = random.choice(self.catalog['category_ids'])
+        if random.random() < 0.3:
+            params['in_stock'] = '1'
+        sort = random.choice(SORTS)
+        if sort != 'default':
+            params['sort'] = sort
+        return '/shop/' + (f"?{urlencode(params)}" if params else '')
+
+    async def browse(self):
+        """Window shopping: the listing with random filters, then a couple of product pages."""
+        await self.call('shop', 'GET', self._shop_query())
+        for _ in range(2):
+            await self.think()
+            await self.call('shop_details', 'GET', f"/shop/product/{random.choice(self.catalog['product_ids'])}/")
+
+    async def buy(self):
+        """Logs in, adds a product to the cart, applies a coupon, checks out and downloads the invoice."""
+        if not await self.login():
+            return
+        product_id = random.choice(self.catalog['product_ids'])
+        await self.call('shop_details', 'GET', f"/shop/product/{product_id}/")
+        await self.think()
+        await self.call('add_to_cart', 'POST', f"/cart/add/{product_id}/", {'quantity': 1})
+        if self.catalog['coupon_code']:
+            await self.call('apply_coupon', 'POST', '/cart/apply-coupon/', {'code': self.catalog['coupon_code']})
+        await self.think()
+        await self.call('checkout_form', 'GET', '/checkout/')
+        await self.think()
+        response = await self.call('checkout', 'POST', '/checkout/', {
+            'full_name': 'Load Test', 'email': self.account['email'], 'phone': '9999999999',
+            'address': '1 Test Street', 'city': 'Pune', 'state': 'MH', 'postcode': '411001', 'country': 'IN',
+        }, ok_statuses=(302,))
+        match = ORDER_URL_RE.search(response.headers.get('location', '')) if response else None
+        if match:
+            self.account['order_ids'].append(int(match.group(1)))
+            await self.call('order_confirm', 'GET', match.group(0))
+            await self.think()
+            await self.call('invoice', 'GET', f"/order/invoice/{match.group(1)}/", ok_statuses=(200,))
+
+    async def reorder(self):
+        """A returning customer checking their profile and re-downloading an old invoice."""
+        if not await self.login():
+            return
+        await self.call('profile', 'GET', '/profile/')
+        if self.account['order_ids']:
+            await self.think()
+            await self.call('invoice', 'GET', f"/order/invoice/{random.choice(self.account['order_ids'])}/", ok_statuses=(200,))
+
+    async def wishlist(self):
+        """A logged-in shopper saving a couple of products to the wishlist and removing them again."""
+        if not await self.login():
+            return
+        for product_id in random.sample(self.catalog['product_ids'], min(2, len(self.catalog['product_ids']))):
+            await self.call('wishlist_add', 'POST', f"/wishlist/add/{product_id}/", {})
+            await self.think()
+            await self.call('wishlist_remove', 'POST', f"/wishlist/remove/{product_id}/", {})
+
+    async def run(self, journeys, weights, deadline, start_delay):
+        await asyncio.sleep(start_delay)
+        try:
+            while time.monotonic() < deadline:
+                journey = random.choices(journeys, weights)[0]
+                await getattr(self, journey)()
+                await self.think()
+        finally:
+            await self.client.close()
+
+
+JOURNEYS = ('browse', 'buy', 'reorder', 'wishlist')
+
+
+def parse_mix(raw):
+    """Parses a journey mix like 'browse=7,buy=2,reorder=1' into (journeys, weights)."""
+    journeys, weights = [], []
+    for part in raw.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in JOURNEYS:
+            raise ValueError(f"Unknown journey '{name}'; choose from {', '.join(JOURNEYS)}.")
+        journeys.append(name)
+        weights.append(float(weight or 1))
+    return journeys, weights
+
+
+async def run_load(base_url, users, duration, mix, catalog, accounts, think_seconds=1.0, ramp_up=5.0):
+    """Runs `users` concurrent shoppers for `duration` seconds. Returns (stats, wall seconds)."""
+    journeys, weights = parse_mix(mix)
+    stats = LoadStats()
+    started = time.monotonic()
+    deadline = started + duration
+    shoppers = [Shopper(base_url, stats, catalog, accounts[i % len(accounts)], think_seconds) for i in range(users)]
+    await asyncio.gather(*(
+        shopper.run(journeys, weights, deadline, ramp_up * i / users) for i, shopper in enumerate(shoppers)
+    ))
+    return stats, time.monotonic() - started
+
+
+async def scrape_metrics(base_url, prefix='leafcart_'):
+    """Reads the app's /metrics/ endpoint; returns {name: value}, or None if it is not reachable."""
+    client = HTTPClient(base_url)
+    try:
+        response = await client.request('GET', '/metrics/')
+    except OSError:
+        return None
+    finally:
+        await client.close()
+    if response.status != 200:
+        return None
+    values = {}
+    for line in response.body.decode().splitlines():
+        if line.startswith(prefix):
+            name, _, value = line.partition(' ')
+            values[name] = float(value)
+    return values
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from shop.recommendations import DEFAULT_TOP_N, rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = "Recomputes the related-product recommendations from order history and category/price similarity."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=DEFAULT_TOP_N, help="Number of neighbours to keep per product.")
+
+    def handle(self, *args, **options):
+        count = rebuild_recommendations(top_n=options['top'])
+        self.stdout.write(self.style.SUCCESS(f"Stored recommendations for {count} products."))
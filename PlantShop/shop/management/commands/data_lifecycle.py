@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from shop.lifecycle import (
+    CART_RETENTION_DAYS, ORDER_ARCHIVE_AFTER_DAYS, LIFECYCLE_BATCH_SIZE,
+    archivable_orders, archive_orders, days_ago, purge_stale_carts, stale_cart_users,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes carts untouched for --cart-days and moves finished orders older than --order-days "
+        "into the archive tables, in bounded batches. Run it from cron, or pass --every to keep it "
+        "running as a small scheduler process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cart-days', type=int, default=CART_RETENTION_DAYS, help="Purge carts not changed for this many days.")
+        parser.add_argument('--order-days', type=int, default=ORDER_ARCHIVE_AFTER_DAYS, help="Archive delivered/cancelled orders older than this many days.")
+        parser.add_argument('--batch-size', type=int, default=LIFECYCLE_BATCH_SIZE, help="Carts or orders per transaction.")
+        parser.add_argument('--every', type=float, default=0, help="Repeat every N seconds instead of running once.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be purged and archived.")
+
+    def handle(self, *args, **options):
+        if options['cart_days'] < 1 or options['order_days'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--cart-days, --order-days and --batch-size must be at least 1.")
+        while True:
+            self.run_once(options)
+            if not options['every']:
+                return
+            close_old_connections()
+            time.sleep(options['every'])
+
+    def run_once(self, options):
+        cart_cutoff = days_ago(options['cart_days'])
+        order_cutoff = days_ago(options['order_days'])
+        if options['dry_run']:
+            self.stdout.write(f"{stale_cart_users(cart_cutoff).count()} stale carts would be purged.")
+            self.stdout.write(f"{archivable_orders(order_cutoff).count()} orders would be archived.")
+            return
+        started = time.perf_counter()
+        cart_items = purge_stale_carts(cart_cutoff, options['batch_size'])
+        orders = archive_orders(order_cutoff, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {cart_items} stale cart items and archived {orders} orders in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,86 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shop.loadgen import parse_mix, run_load, scrape_metrics
+from shop.models import Category, Coupon, Order, Product, User
+
+
+LOADTEST_EMAIL = 'loadtest-{}@example.invalid'
+LOADTEST_PASSWORD = 'loadtest-password'
+
+SQLITE_METRICS = (
+    ('leafcart_sqlite_writes_total', "write statements"),
+    ('leafcart_sqlite_write_seconds_total', "seconds in write statements"),
+    ('leafcart_sqlite_slow_writes_total', "slow writes (lock waits)"),
+    ('leafcart_sqlite_locked_errors_total', "'database is locked' errors"),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives simulated shoppers (browse, buy, reorder, wishlist journeys) against a running server and reports "
+        "throughput, error rate and latency per endpoint, plus SQLite lock-wait statistics from /metrics/. "
+        "Places real orders and creates loadtest-N accounts; run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--users', type=int, default=20, help="Concurrent simulated shoppers.")
+        parser.add_argument('--duration', type=float, default=60, help="Seconds to run.")
+        parser.add_argument('--mix', default='browse=7,buy=2,reorder=1', help="Journey weights, e.g. browse=7,buy=2,reorder=1.")
+        parser.add_argument('--think', type=float, default=1.0, help="Mean think time between requests in seconds (0 for none).")
+        parser.add_argument('--ramp-up', type=float, default=5.0, help="Seconds over which shoppers are started.")
+
+    def _prepare_accounts(self, count):
+        """Creates (or reuses) one account per shopper, so carts and sessions don't collide."""
+        accounts = []
+        for i in range(count):
+            user, created = User.objects.get_or_create(email=LOADTEST_EMAIL.format(i), defaults={'full_name': f'Load Test {i}'})
+            if created:
+                user.set_password(LOADTEST_PASSWORD)
+                user.save(update_fields=['password'])
+            order_ids = list(Order.objects.filter(user=user).values_list('id', flat=True)[:20])
+            accounts.append({'email': user.email, 'password': LOADTEST_PASSWORD, 'order_ids': order_ids})
+        return accounts
+
+    def handle(self, *args, **options):
+        try:
+            parse_mix(options['mix'])
+        except ValueError as e:
+            raise CommandError(e)
+        product_ids = list(Product.objects.filter(is_available=True, stock__gt=0).values_list('id', flat=True))
+        if not product_ids:
+            raise CommandError("There are no in-stock products to shop for.")
+        catalog = {
+            'product_ids': product_ids,
+            'category_ids': list(Category.objects.filter(is_active=True).values_list('id', flat=True)),
+            'coupon_code': Coupon.objects.filter(is_active=True).values_list('code', flat=True).first(),
+        }
+        accounts = self._prepare_accounts(options['users'])
+
+        base_url = options['base_url'].rstrip('/')
+        before = asyncio.run(scrape_metrics(base_url))
+        stats, wall = asyncio.run(run_load(
+            base_url, options['users'], options['duration'], options['mix'], catalog, accounts,
+            think_seconds=options['think'], ramp_up=options['ramp_up'],
+        ))
+        after = asyncio.run(scrape_metrics(base_url))
+
+        self.stdout.write(f"{options['users']} shoppers for {wall:.1f}s against {base_url} (mix {options['mix']})\n")
+        if not stats.samples:
+            raise CommandError("No requests completed; is the server running?")
+        for line in stats.report_lines(wall):
+            self.stdout.write(line)
+
+        self.stdout.write("")
+        if before is None or after is None:
+            self.stdout.write("SQLite lock statistics unavailable: /metrics/ must be reachable from this host.")
+            return
+        self.stdout.write("SQLite lock statistics for this run (from the worker that served /metrics/):")
+        for name, label in SQLITE_METRICS:
+            self.stdout.write(f"  {label:<32} {after.get(name, 0) - before.get(name, 0):>10.2f}")
+        writes = after.get(SQLITE_METRICS[0][0], 0) - before.get(SQLITE_METRICS[0][0], 0)
+        if writes:
+            seconds = after.get(SQLITE_METRICS[1][0], 0) - before.get(SQLITE_METRICS[1][0], 0)
+            self.stdout.write(f"  {'mean ms per write':<32} {seconds / writes * 1000:>10.2f}")
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from shop.models import Order, OrderStatusEvent
+from shop.order_status import ORDER_TRANSITIONS
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports how long orders took to move between two statuses over a recent window, from the "
+        "status event log, and lists orders still waiting in the starting status past the SLA."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='from_status', default='Pending')
+        parser.add_argument('--to', dest='to_status', default='Shipped')
+        parser.add_argument('--days', type=int, default=30, help="Window of completed transitions to report on.")
+        parser.add_argument('--sla-hours', type=float, default=48)
+
+    def handle(self, *args, **options):
+        from_status, to_status = options['from_status'], options['to_status']
+        if from_status not in ORDER_TRANSITIONS or to_status not in ORDER_TRANSITIONS:
+            raise CommandError(f"Statuses must be one of: {', '.join(ORDER_TRANSITIONS)}.")
+        now = timezone.now()
+        since = now - timedelta(days=options['days'])
+
+        # Both lookups are served by the (to_status, created_at) and (order, created_at) indexes
+        finished = dict(
+            OrderStatusEvent.objects.filter(to_status=to_status, created_at__gte=since).values_list('order_id', 'created_at')
+        )
+        started = dict(
+            OrderStatusEvent.objects.filter(to_status=from_status, order_id__in=list(finished)).order_by('created_at').values_list('order_id', 'created_at')
+        )
+        hours = [(finished[order_id] - started_at).total_seconds() / 3600 for order_id, started_at in started.items()]
+
+        self.stdout.write(f"{from_status} -> {to_status}, last {options['days']} days: {len(hours)} orders")
+        if hours:
+            within = sum(1 for h in hours if h <= options['sla_hours'])
+            self.stdout.write(
+                f"  median {percentile(hours, 50):.1f} h, p95 {percentile(hours, 95):.1f} h, max {max(hours):.1f} h; "
+                f"{within / len(hours):.0%} within {options['sla_hours']:g} h"
+            )
+
+        cutoff = now - timedelta(hours=options['sla_hours'])
+        overdue = list(
+            Order.objects.filter(status=from_status).annotate(entered=Coalesce('status_changed_at', 'created_at'))
+            .filter(entered__lt=cutoff).order_by('entered').values_list('id', 'entered')
+        )
+        self.stdout.write(f"Orders in {from_status} for over {options['sla_hours']:g} h: {len(overdue)}")
+        for order_id, entered in overdue[:20]:
+            self.stdout.write(f"  #{order_id} since {entered:%Y-%m-%d %H:%M}")
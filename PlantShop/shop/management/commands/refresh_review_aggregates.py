@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from shop.models import Product
+from shop.reviews import refresh_review_aggregates
+
+
+class Command(BaseCommand):
+    help = "Recomputes every product's stored rating average, count and histogram from approved reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        product_ids = list(Product.objects.values_list('id', flat=True))
+        size = options['batch_size']
+        for start in range(0, len(product_ids), size):
+            refresh_review_aggregates(product_ids[start:start + size])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed rating aggregates for {len(product_ids)} products."))
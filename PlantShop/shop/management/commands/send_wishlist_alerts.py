@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from shop.wishlist_alerts import ALERT_CHUNK_SIZE, deliver_pending_alerts
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends pending back-in-stock and price-drop wishlist alerts. The in-process worker normally "
+        "sends them seconds after a product is saved; run this from cron to pick up any it missed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=ALERT_CHUNK_SIZE, help="Wishlist rows read and messages sent per batch.")
+
+    def handle(self, *args, **options):
+        sent = deliver_pending_alerts(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} wishlist alert emails."))
@@ -0,0 +1,75 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from shop.session import COUPON_KEY
+
+
+DEFAULT_ENGINES = [
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.signed_cookies',
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures per-request session overhead (load, plus save on a fraction of requests) for each "
+        "session engine under concurrent threads. Writes real session rows; run against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engine', action='append', dest='engines', help="Session engine to test (repeatable).")
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=2000, help="Simulated requests per engine.")
+        parser.add_argument('--write-ratio', type=float, default=0.1, help="Fraction of requests that modify the session.")
+
+    def _simulate(self, store_class, session_key, write):
+        start = time.perf_counter()
+        session = store_class(session_key=session_key)
+        coupon_id = session.get(COUPON_KEY)
+        if write:
+            session[COUPON_KEY] = coupon_id + 1
+            session.save()
+        elapsed = time.perf_counter() - start
+        close_old_connections()
+        return elapsed * 1000, session.session_key
+
+    def handle(self, *args, **options):
+        engines = options['engines'] or DEFAULT_ENGINES
+        total, threads = options['requests'], options['threads']
+        writes_every = int(1 / options['write_ratio']) if options['write_ratio'] > 0 else 0
+
+        self.stdout.write(f"{'engine':<50} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for engine in engines:
+            store_class = import_module(engine).SessionStore
+            # One session per simulated client, created up front like an existing logged-in user.
+            keys = []
+            for _ in range(threads):
+                session = store_class()
+                session[COUPON_KEY] = 1
+                session.save()
+                keys.append(session.session_key)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                futures = [
+                    pool.submit(self._simulate, store_class, keys[i % threads], bool(writes_every) and i % writes_every == 0)
+                    for i in range(total)
+                ]
+                samples = [future.result()[0] for future in futures]
+            wall = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{engine:<50} {total / wall:>9.0f} {statistics.median(samples):>8.3f} "
+                f"{percentile(samples, 95):>8.3f} {percentile(samples, 99):>8.3f}"
+            )
@@ -0,0 +1,95 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Optional dependencies that must stay out of the startup path; they are imported on first use.
+HEAVY_MODULES = ('weasyprint', 'numpy', 'scipy', 'brotli')
+
+# Runs in a fresh interpreter: boots Django, loads the URLconf, then serves one request.
+# The request runs against a freshly migrated test database, so the result does not depend
+# on the state of the configured one; the time spent creating it is not counted.
+PROBE = r"""
+import json, os, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+ready = time.perf_counter()
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment
+setup_test_environment()
+db_start = time.perf_counter()
+old_name = connection.settings_dict['NAME']
+connection.creation.create_test_db(verbosity=0, autoclobber=True)
+db_seconds = time.perf_counter() - db_start
+try:
+    status = Client().get(sys.argv[1]).status_code
+    done = time.perf_counter()
+finally:
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+print(json.dumps({
+    'setup_ms': (ready - start) * 1000,
+    'first_request_ms': (done - start - db_seconds) * 1000,
+    'status': status,
+    'heavy_loaded': [m for m in sys.argv[2].split(',') if m in sys.modules],
+}))
+"""
+
+
+def parse_importtime(stderr, top):
+    """Returns the `top` modules by cumulative import time (in ms) from `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace('import time:', '|', 1).split('|')]
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+class Command(BaseCommand):
+    help = "Measures import time and time-to-first-request in a fresh interpreter and checks them against a budget."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/about/', help="URL requested as the first request.")
+        parser.add_argument('--setup-budget-ms', type=float, default=1500, help="Budget for django.setup() plus URLconf loading.")
+        parser.add_argument('--first-request-budget-ms', type=float, default=2500, help="Budget from interpreter start to first response.")
+        parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list.")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'PlantShop.settings')}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE, options['url'], ','.join(HEAVY_MODULES)],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup probe failed:\n{result.stderr[-2000:]}")
+        measured = json.loads(result.stdout.strip().splitlines()[-1])
+
+        self.stdout.write("Slowest imports (cumulative ms / self ms):")
+        for cumulative, self_ms, name in parse_importtime(result.stderr, options['top']):
+            self.stdout.write(f"  {cumulative:9.1f}  {self_ms:8.1f}  {name}")
+        self.stdout.write(f"django.setup() + URLconf: {measured['setup_ms']:.1f} ms (budget {options['setup_budget_ms']:.0f} ms)")
+        self.stdout.write(
+            f"First request to {options['url']} (HTTP {measured['status']}): "
+            f"{measured['first_request_ms']:.1f} ms (budget {options['first_request_budget_ms']:.0f} ms)"
+        )
+
+        failures = []
+        if measured['setup_ms'] > options['setup_budget_ms']:
+            failures.append("setup time is over budget")
+        if measured['first_request_ms'] > options['first_request_budget_ms']:
+            failures.append("time to first request is over budget")
+        if measured['heavy_loaded']:
+            failures.append(f"heavy modules imported at startup: {', '.join(measured['heavy_loaded'])}")
+        if failures:
+            raise CommandError("; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Startup is within budget."))
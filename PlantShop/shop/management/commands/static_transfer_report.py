@@ -0,0 +1,72 @@
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+
+STATIC_TAG_RE = re.compile(r"""{%\s*static\s+['"]([^'"]+)['"]\s*%}""")
+CSS_IMPORT_RE = re.compile(r"""@import\s+url\(\s*['"]?([^'")]+)['"]?\s*\)""")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the static bytes a first visit to a template transfers, before (source files, "
+        "uncompressed) and after (collected files, best precompressed variant). Run collectstatic first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', default='base.html', help="Template whose {% static %} references are measured.")
+
+    def _template_assets(self, template_name):
+        path = os.path.join(settings.BASE_DIR, 'templates', template_name)
+        if not os.path.isfile(path):
+            raise CommandError(f"Template not found: {path}")
+        with open(path, encoding='utf-8') as template:
+            return list(dict.fromkeys(STATIC_TAG_RE.findall(template.read())))
+
+    def _with_css_imports(self, names):
+        """Adds local stylesheets pulled in through @import, since the browser fetches those too."""
+        seen, pending = [], list(names)
+        while pending:
+            name = pending.pop(0)
+            if name in seen:
+                continue
+            seen.append(name)
+            source = finders.find(name)
+            if name.endswith('.css') and source:
+                with open(source, encoding='utf-8', errors='ignore') as css:
+                    for target in CSS_IMPORT_RE.findall(css.read()):
+                        if '://' not in target and not target.startswith('//'):
+                            pending.append(posixpath.normpath(posixpath.join(posixpath.dirname(name), target)))
+        return seen
+
+    def handle(self, *args, **options):
+        if not settings.STATIC_ROOT or not os.path.isdir(settings.STATIC_ROOT):
+            raise CommandError("STATIC_ROOT is empty. Run collectstatic first.")
+
+        rows, before_total, after_total = [], 0, 0
+        for name in self._with_css_imports(self._template_assets(options['template'])):
+            source = finders.find(name)
+            if not source:
+                self.stderr.write(f"Missing static file: {name}")
+                continue
+            before = os.path.getsize(source)
+            collected = staticfiles_storage.path(staticfiles_storage.stored_name(name))
+            candidates = [collected + suffix for suffix in ('.br', '.gz', '')]
+            after = min(os.path.getsize(path) for path in candidates if os.path.isfile(path))
+            rows.append((name, before, after))
+            before_total += before
+            after_total += after
+
+        width = max(len(name) for name, _, _ in rows) if rows else 10
+        self.stdout.write(f"{'asset':<{width}}  {'before':>10}  {'after':>10}")
+        for name, before, after in rows:
+            self.stdout.write(f"{name:<{width}}  {before:>10}  {after:>10}")
+        saved = 100 * (1 - after_total / before_total) if before_total else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{'total':<{width}}  {before_total:>10}  {after_total:>10}  ({saved:.1f}% fewer bytes)"
+        ))
@@ -0,0 +1,48 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+
+# ===================================================================
+# METRICS REGISTRY
+# ===================================================================
+
+_gauges = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+def register_gauge(name, help_text, read):
+    """Registers a gauge whose value is read from the `read` callable at scrape time."""
+    _gauges[name] = (help_text, read)
+
+
+def increment(name, help_text, amount=1):
+    """Adds `amount` to a process-wide counter, creating it on first use."""
+    with _lock:
+        current = _counters.get(name, (help_text, 0))[1]
+        _counters[name] = (help_text, current + amount)
+
+
+def render_metrics():
+    """Returns all registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for name, (help_text, read) in sorted(_gauges.items()):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {read()}"]
+    with _lock:
+        counters = sorted(_counters.items())
+    for name, (help_text, value) in counters:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """Serves the metrics to local scrapers and staff users only."""
+    allowed_ips = getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if request.META.get('REMOTE_ADDR') not in allowed_ips and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4')
@@ -0,0 +1,230 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags
+from django.views.static import was_modified_since
+
+from .auth_backends import BACKEND_PATH as CACHED_BACKEND_PATH
+
+
+# ===================================================================
+# FILE SERVING
+# ===================================================================
+
+# Names produced by ManifestStaticFilesStorage and ContentHashedFileSystemStorage, e.g. style.3f2a9c1b7d4e.css
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=3600'
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """
+    Read-only view of the next `length` bytes of an open file. It has no fileno(), so the server
+    copies just those bytes instead of sendfile()-ing to the end of the file.
+    """
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Returns (start, end) for a single-range `Range` header, None to serve the whole file
+    (no header, or one we don't handle such as multiple ranges), or False if it is unsatisfiable.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+class FileServingMiddleware:
+    """
+    Serves files under `url_prefix` from `root` before the rest of the stack runs. Whole files and
+    open-ended ranges go out as FileResponses, which WSGI servers with a file_wrapper (gunicorn,
+    uWSGI) send with sendfile(). Handles ETag/Last-Modified revalidation and single byte ranges;
+    names with a content hash are cached as immutable.
+    """
+    url_prefix = root = None
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.url_prefix):
+            response = self.serve(request, request.path[len(self.url_prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def resolve(self, name):
+        """Returns the file's path under the root, or None if there is no such file."""
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        return path if os.path.isfile(path) else None
+
+    def serve(self, request, name):
+        path = self.resolve(name)
+        if path is None:
+            return None
+        return self.file_response(request, path, path, bool(HASHED_NAME_RE.search(name)))
+
+    def file_response(self, request, path, served_path, immutable, encoding=None):
+        stat = os.stat(served_path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = http_date(stat.st_mtime)
+        headers = {
+            'ETag': etag,
+            'Last-Modified': last_modified,
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        }
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            not_modified = etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+        else:
+            not_modified = not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime)
+        if not_modified:
+            response = HttpResponseNotModified()
+            for header, value in headers.items():
+                response.headers[header] = value
+            return response
+
+        byte_range = None
+        if encoding is None:
+            headers['Accept-Ranges'] = 'bytes'
+            if_range = request.META.get('HTTP_IF_RANGE')
+            if 'HTTP_RANGE' in request.META and (if_range is None or if_range in (etag, last_modified)):
+                byte_range = parse_range(request.META['HTTP_RANGE'], stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        file = open(served_path, 'rb')
+        if byte_range is None:
+            response = FileResponse(file, content_type=content_type)
+        else:
+            start, end = byte_range
+            file.seek(start)
+            if end == stat.st_size - 1:
+                response = FileResponse(file, content_type=content_type, status=206)
+            else:
+                response = FileResponse(FileRange(file, end - start + 1), content_type=content_type, status=206)
+                response.headers['Content-Length'] = end - start + 1
+            response.headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        del response.headers['Content-Disposition']
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        for header, value in headers.items():
+            response.headers[header] = value
+        return response
+
+
+class PrecompressedStaticFilesMiddleware(FileServingMiddleware):
+    """
+    Serves collected static files from STATIC_ROOT in production, picking the `.br` or `.gz`
+    sibling written at collectstatic time when the client accepts it. Hashed names get
+    far-future immutable caching; other files get a short max-age and revalidation.
+    Disabled when DEBUG is on, where runserver serves static files from the source folders.
+    """
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.url_prefix = settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT)
+
+    def _pick_variant(self, request, path):
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if encoding in accepted and os.path.isfile(path + suffix):
+                return path + suffix, encoding
+        return path, None
+
+    def serve(self, request, name):
+        path = self.resolve(name)
+        if path is None:
+            return None
+        served_path, encoding = self._pick_variant(request, path)
+        response = self.file_response(request, path, served_path, bool(HASHED_NAME_RE.search(name)), encoding)
+        # Caches must key on Accept-Encoding whenever a compressed variant exists
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+
+class MediaFilesMiddleware(FileServingMiddleware):
+    """
+    Serves uploaded product and category images from MEDIA_ROOT, in development and production.
+    With MEDIA_ACCEL_REDIRECT set (e.g. '/protected-media/'), the response is instead an empty
+    X-Accel-Redirect to that internal location, and the fronting nginx sends the file itself.
+    """
+    def __init__(self, get_response):
+        if not settings.MEDIA_ROOT or not settings.MEDIA_URL.startswith('/'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.url_prefix = settings.MEDIA_URL
+        self.root = str(settings.MEDIA_ROOT)
+        self.accel_redirect = getattr(settings, 'MEDIA_ACCEL_REDIRECT', None)
+
+    def serve(self, request, name):
+        path = self.resolve(name)
+        if path is None:
+            return None
+        immutable = bool(HASHED_NAME_RE.search(name))
+        if not self.accel_redirect:
+            return self.file_response(request, path, path, immutable)
+        # nginx handles ranges and revalidation for the internal location and keeps these headers
+        response = HttpResponse(content_type=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = self.accel_redirect + quote(name)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        return response
+
+
+# ===================================================================
+# AUTHENTICATION
+# ===================================================================
+
+LEGACY_BACKEND_PATH = 'django.contrib.auth.backends.ModelBackend'
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware that moves sessions logged in through the plain ModelBackend over
+    to the cached backend, so existing logins also load the user from its cached snapshot.
+    The session is only read when the request carries a session cookie.
+    """
+    def process_request(self, request):
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            if request.session.get(BACKEND_SESSION_KEY) == LEGACY_BACKEND_PATH:
+                request.session[BACKEND_SESSION_KEY] = CACHED_BACKEND_PATH
+        super().process_request(request)
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:18
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    """Keeps only the newest review per (product, user) so the unique constraint can be added."""
+    Review = apps.get_model('shop', 'Review')
+    seen = set()
+    duplicates = []
+    for review_id, product_id, user_id in Review.objects.order_by('-created_at', '-id').values_list('id', 'product_id', 'user_id'):
+        if (product_id, user_id) in seen:
+            duplicates.append(review_id)
+        seen.add((product_id, user_id))
+    Review.objects.filter(id__in=duplicates).delete()
+
+
+def backfill_review_aggregates(apps, schema_editor):
+    Product = apps.get_model('shop', 'Product')
+    Review = apps.get_model('shop', 'Review')
+    histograms = {}
+    for product_id, rating, count in Review.objects.values_list('product_id', 'rating').annotate(n=models.Count('id')).order_by():
+        if 1 <= rating <= 5:
+            histograms.setdefault(product_id, [0] * 5)[rating - 1] = count
+    products = list(Product.objects.filter(id__in=histograms))
+    for product in products:
+        histogram = histograms[product.id]
+        product.rating_count = sum(histogram)
+        product.rating_average = sum(star * n for star, n in zip(range(1, 6), histogram)) / product.rating_count
+        product.rating_histogram = histogram
+    Product.objects.bulk_update(products, ['rating_average', 'rating_count', 'rating_histogram'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_productrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_average',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_histogram',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='is_approved',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='rating',
+            field=models.PositiveIntegerField(default=5, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)]),
+        ),
+        migrations.RunPython(remove_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='review',
+            unique_together={('product', 'user')},
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'is_approved', '-created_at'], name='shop_review_product_bf7cf9_idx'),
+        ),
+        migrations.RunPython(backfill_review_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_status_events(apps, schema_editor):
+    """Opens a timeline for existing orders with their current status at creation time."""
+    Order = apps.get_model('shop', 'Order')
+    OrderStatusEvent = apps.get_model('shop', 'OrderStatusEvent')
+    events = [
+        OrderStatusEvent(order_id=order_id, from_status='', to_status=status, changed_by_id=user_id, created_at=created_at)
+        for order_id, status, user_id, created_at in Order.objects.values_list('id', 'status', 'user_id', 'created_at').iterator()
+    ]
+    OrderStatusEvent.objects.bulk_create(events, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0003_review_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=50)),
+                ('to_status', models.CharField(choices=[('Pending', 'Pending'), ('Processing', 'Processing'), ('Shipped', 'Shipped'), ('Delivered', 'Delivered'), ('Cancelled', 'Cancelled')], max_length=50)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='status_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at'], name='shop_order_status_700268_idx'),
+        ),
+        migrations.AddField(
+            model_name='orderstatusevent',
+            name='changed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='orderstatusevent',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='shop.order'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatusevent',
+            index=models.Index(fields=['order', 'created_at'], name='shop_orders_order_i_5a6d34_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatusevent',
+            index=models.Index(fields=['to_status', 'created_at'], name='shop_orders_to_stat_629d7e_idx'),
+        ),
+        migrations.RunPython(seed_status_events, migrations.RunPython.noop),
+    ]
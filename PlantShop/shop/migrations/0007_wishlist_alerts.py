@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0006_data_lifecycle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('back_in_stock', 'Back in stock'), ('price_drop', 'Price drop')], max_length=20)),
+                ('old_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='wishlist',
+            index=models.Index(fields=['product', 'user'], name='shop_wishli_product_c6b80e_idx'),
+        ),
+        migrations.AddField(
+            model_name='productalert',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='shop.product'),
+        ),
+        migrations.AddIndex(
+            model_name='productalert',
+            index=models.Index(fields=['product', 'kind', 'created_at'], name='shop_produc_product_75976d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productalert',
+            index=models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='shop_productalert_pending'),
+        ),
+    ]
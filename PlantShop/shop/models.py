@@ -3,9 +3,9 @@
 # ===================================================================
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin, Group, Permission
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Avg
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -55,6 +55,19 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    # A user built from a cached auth snapshot (shop.auth_backends) has its password deferred
+    # and carries what the auth middleware and admin need to know about it instead.
+
+    def get_session_auth_hash(self):
+        if 'password' in self.get_deferred_fields() and hasattr(self, '_session_auth_hash'):
+            return self._session_auth_hash
+        return super().get_session_auth_hash()
+
+    def has_usable_password(self):
+        if 'password' in self.get_deferred_fields() and hasattr(self, '_has_usable_password'):
+            return self._has_usable_password
+        return super().has_usable_password()
+
 # ===================================================================
 # 2. CORE E-COMMERCE MODELS
 # ===================================================================
@@ -83,6 +96,22 @@ class Product(models.Model):
     is_bestseller = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # --- Review aggregates, refreshed in the background by shop.reviews ---
+    rating_average = models.FloatField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_histogram = models.JSONField(default=list, blank=True)  # review counts for 1..5 stars
+
+    class Meta:
+        # One index per listing sort in shop.sorting, each ending in the id tiebreaker
+        indexes = [
+            models.Index(fields=['price', 'id']),
+            models.Index(fields=['name', 'id']),
+            models.Index(fields=['-rating_average', '-rating_count', '-id']),
+            models.Index(fields=['-rating_count', '-rating_average', '-id']),
+            models.Index(fields=['-is_bestseller', '-created_at', '-id']),
+            models.Index(fields=['-created_at', '-id']),
+        ]
+
     def __str__(self):
         return self.name
     
@@ -90,22 +119,22 @@ class Product(models.Model):
 
     @property
     def average_rating(self):
-        """Calculates the average rating from all reviews, returns 0 if none exist."""
-        return self.reviews.aggregate(Avg('rating'))['rating__avg'] or 0
+        """Returns the stored average rating of approved reviews, 0 if none exist."""
+        return self.rating_average
 
     @property
     def review_count(self):
-        """Returns the total number of reviews for the product."""
-        return self.reviews.count()
+        """Returns the stored number of approved reviews for the product."""
+        return self.rating_count
     
     @property
     def rating_breakdown(self):
-        """Calculates the percentage of 1, 2, 3, 4, and 5-star reviews."""
+        """Returns the percentage of 1, 2, 3, 4, and 5-star reviews from the stored histogram."""
         breakdown = {f'{i}_star_percent': 0 for i in range(1, 6)}
-        total = self.review_count
-        if total > 0:
+        total = self.rating_count
+        if total > 0 and len(self.rating_histogram) == 5:
             for i in range(1, 6):
-                breakdown[f'{i}_star_percent'] = (self.reviews.filter(rating=i).count() / total) * 100
+                breakdown[f'{i}_star_percent'] = (self.rating_histogram[i - 1] / total) * 100
         return breakdown
 
 class ProductImage(models.Model):
@@ -129,6 +158,8 @@ class CartItem(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
+    # Last add or quantity change; carts untouched for CART_RETENTION_DAYS are purged (shop.lifecycle)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     @property
     def get_total(self):
@@ -159,6 +190,10 @@ class Order(models.Model):
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='Pending')
     payment_method = models.CharField(max_length=50, default='Cash on Delivery')
     created_at = models.DateTimeField(auto_now_add=True)
+    status_changed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
 
     def __str__(self):
         return f"Order #{self.id}"
@@ -182,6 +217,73 @@ class OrderItem(models.Model):
         """Calculates the total price for this line item."""
         return self.price * self.quantity
 
+class OrderStatusEvent(models.Model):
+    """
+    Append-only log of order status changes, one row per order per transition.
+    Written by shop.order_status; never updated or deleted in normal operation.
+    """
+    order = models.ForeignKey(Order, related_name='status_events', on_delete=models.CASCADE)
+    from_status = models.CharField(max_length=50, blank=True)
+    to_status = models.CharField(max_length=50, choices=Order.STATUS_CHOICES)
+    changed_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['order', 'created_at']),
+            models.Index(fields=['to_status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id}: {self.from_status or '-'} -> {self.to_status}"
+
+class ArchivedOrder(models.Model):
+    """
+    An order moved out of the hot Order table by shop.lifecycle once it has been finished for
+    ORDER_ARCHIVE_AFTER_DAYS. Keeps the original id, so order URLs keep working, and the
+    fields the confirmation page and invoice read. The status timeline is kept as JSON.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    full_name = models.CharField(max_length=150)
+    email = models.EmailField()
+    phone = models.CharField(max_length=20)
+    address = models.TextField()
+    city = models.CharField(max_length=100)
+    state = models.CharField(max_length=100)
+    postcode = models.CharField(max_length=20)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    shipping_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    status = models.CharField(max_length=50, choices=Order.STATUS_CHOICES)
+    payment_method = models.CharField(max_length=50)
+    created_at = models.DateTimeField()
+    status_changed_at = models.DateTimeField(null=True, blank=True)
+    # [[from_status, to_status, changed_by_id, created_at iso], ...] from OrderStatusEvent
+    status_history = models.JSONField(default=list, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['user', '-id'])]
+
+    def __str__(self):
+        return f"Order #{self.id} (archived)"
+
+    @property
+    def subtotal(self):
+        return self.total_price - self.shipping_cost
+
+class ArchivedOrderItem(models.Model):
+    """A line item of an ArchivedOrder; same shape as OrderItem."""
+    order = models.ForeignKey(ArchivedOrder, related_name='items', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    quantity = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    @property
+    def get_total(self):
+        return self.price * self.quantity
+
 # ===================================================================
 # 4. USER INTERACTION MODELS
 # ===================================================================
@@ -192,10 +294,16 @@ class Review(models.Model):
     """
     product = models.ForeignKey(Product, related_name="reviews", on_delete=models.CASCADE)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    rating = models.PositiveIntegerField(default=5)
+    rating = models.PositiveIntegerField(default=5, validators=[MinValueValidator(1), MaxValueValidator(5)])
     comment = models.TextField()
+    is_approved = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # One review per user and product; resubmitting updates the existing review.
+        unique_together = ('product', 'user')
+        indexes = [models.Index(fields=['product', 'is_approved', '-created_at'])]
+
     def __str__(self):
         return f"Review for {self.product.name} by {self.user.full_name}"
 
@@ -210,10 +318,39 @@ class Wishlist(models.Model):
     class Meta:
         # Ensures a user can only add a specific product to their wishlist once.
         unique_together = ('user', 'product')
+        # The unique index leads with user; wishlist alerts look up a product's wishers, in user order
+        indexes = [models.Index(fields=['product', 'user'])]
 
     def __str__(self):
         return f"{self.product.name} in {self.user.email}'s Wishlist"
 
+class ProductAlert(models.Model):
+    """
+    A queued wishlist notification: a product came back in stock or got cheaper.
+    Created by shop.wishlist_alerts when a product is saved, and fanned out to everyone
+    wishlisting the product by its worker. A delivery run claims the alert and marks it
+    processed once its emails are sent; a failed run releases the claim for a retry.
+    """
+    BACK_IN_STOCK = 'back_in_stock'
+    PRICE_DROP = 'price_drop'
+    KIND_CHOICES = ((BACK_IN_STOCK, 'Back in stock'), (PRICE_DROP, 'Price drop'))
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    old_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'kind', 'created_at']),
+            models.Index(fields=['id'], condition=models.Q(processed_at__isnull=True), name='shop_productalert_pending'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.product_id}"
+
 # ===================================================================
 # 5. SITE UTILITY MODELS
 # ===================================================================
@@ -240,4 +377,21 @@ class Coupon(models.Model):
     is_active = models.BooleanField(default=True)
     
     def __str__(self):
-        return f"{self.code} ({self.discount_percent}%)"
\ No newline at end of file
+        return f"{self.code} ({self.discount_percent}%)"
+
+# ===================================================================
+# 6. PRECOMPUTED CATALOG DATA
+# ===================================================================
+
+class ProductRecommendation(models.Model):
+    """
+    Stores the precomputed related-product ids for a single Product.
+    Rebuilt in bulk by the `build_recommendations` management command.
+    """
+    product = models.OneToOneField(Product, primary_key=True, related_name='recommendation', on_delete=models.CASCADE)
+    bought_together_ids = models.JSONField(default=list)
+    similar_ids = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Recommendations for {self.product_id}"
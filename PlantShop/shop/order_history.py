@@ -0,0 +1,82 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from django.core.cache import cache
+from django.db.models import Count, Sum, Prefetch
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+
+# ===================================================================
+# ORDER HISTORY PAGES & CACHED STATS
+# ===================================================================
+
+ORDER_HISTORY_PAGE_SIZE = 10
+ORDER_STATS_CACHE_TIMEOUT = 60 * 60
+
+
+def get_order_page(user, before=None, page_size=ORDER_HISTORY_PAGE_SIZE):
+    """
+    Returns one keyset page of the user's orders (newest first) and the cursor for the next page.
+    Reads through to the archive tables, which keep original ids, so old orders stay listed.
+    Line items and their products are prefetched in a single extra query per table.
+    """
+    page = []
+    for model, item_model in ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem)):
+        orders = (
+            model.objects.filter(user=user)
+            .prefetch_related(Prefetch('items', queryset=item_model.objects.select_related('product')))
+            .order_by('-id')
+        )
+        if before:
+            orders = orders.filter(id__lt=before)
+        page += orders[:page_size + 1]
+    page.sort(key=lambda order: order.id, reverse=True)
+    next_cursor = page[page_size - 1].id if len(page) > page_size else None
+    return page[:page_size], next_cursor
+
+
+def _order_sources(queryset, archived_queryset):
+    return (
+        Order.objects.all() if queryset is None else queryset,
+        ArchivedOrder.objects.all() if archived_queryset is None else archived_queryset,
+    )
+
+
+def get_user_order(user, order_id, queryset=None, archived_queryset=None):
+    """Returns the user's order from the hot table or, failing that, the archive; None if neither has it."""
+    for candidates in _order_sources(queryset, archived_queryset):
+        order = candidates.filter(id=order_id, user=user).first()
+        if order is not None:
+            return order
+    return None
+
+
+async def aget_user_order(user, order_id, queryset=None, archived_queryset=None):
+    """See get_user_order()."""
+    for candidates in _order_sources(queryset, archived_queryset):
+        order = await candidates.filter(id=order_id, user=user).afirst()
+        if order is not None:
+            return order
+    return None
+
+
+def _order_stats_key(user_id):
+    return f'order_stats:{user_id}'
+
+
+def get_order_stats(user_id):
+    """Returns the cached order count and lifetime total for a user."""
+    def compute():
+        stats = {'order_count': 0, 'lifetime_total': 0}
+        for model in (Order, ArchivedOrder):
+            totals = model.objects.filter(user_id=user_id).aggregate(order_count=Count('id'), lifetime_total=Sum('total_price'))
+            stats['order_count'] += totals['order_count']
+            stats['lifetime_total'] += totals['lifetime_total'] or 0
+        return stats
+    return cache.get_or_set(_order_stats_key(user_id), compute, ORDER_STATS_CACHE_TIMEOUT)
+
+
+def invalidate_order_stats(user_id):
+    """Drops the cached order stats so the next read recomputes them."""
+    cache.delete(_order_stats_key(user_id))
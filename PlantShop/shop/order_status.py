@@ -0,0 +1,64 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Order, OrderStatusEvent
+
+
+# ===================================================================
+# ORDER STATUS STATE MACHINE
+# ===================================================================
+
+# Allowed moves from each status. Delivered and Cancelled are final.
+ORDER_TRANSITIONS = {
+    'Pending': ('Processing', 'Cancelled'),
+    'Processing': ('Shipped', 'Cancelled'),
+    'Shipped': ('Delivered',),
+    'Delivered': (),
+    'Cancelled': (),
+}
+
+
+def can_transition(from_status, to_status):
+    return to_status in ORDER_TRANSITIONS.get(from_status, ())
+
+
+def sources_for(to_status):
+    """Returns the statuses an order may move to `to_status` from."""
+    return [status for status, targets in ORDER_TRANSITIONS.items() if to_status in targets]
+
+
+def validate_transition(from_status, to_status):
+    if from_status != to_status and not can_transition(from_status, to_status):
+        raise ValidationError(f"An order cannot move from {from_status} to {to_status}.")
+
+
+def record_status_event(order, from_status, user=None):
+    """Logs a single order's status change, e.g. on creation or an admin edit."""
+    OrderStatusEvent.objects.create(order=order, from_status=from_status, to_status=order.status, changed_by=user)
+
+
+def transition_orders(queryset, to_status, user=None):
+    """
+    Moves every order in `queryset` that may legally reach `to_status` there with a single
+    UPDATE, and logs one event per order with bulk_create. Orders in any other status are
+    left alone. Returns (changed, skipped).
+    """
+    if to_status not in ORDER_TRANSITIONS:
+        raise ValidationError(f"Unknown order status: {to_status}.")
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().values_list('id', 'status'))
+        eligible = [(order_id, status) for order_id, status in rows if can_transition(status, to_status)]
+        if eligible:
+            Order.objects.filter(id__in=[order_id for order_id, _ in eligible], status__in=sources_for(to_status)).update(
+                status=to_status, status_changed_at=now,
+            )
+            OrderStatusEvent.objects.bulk_create([
+                OrderStatusEvent(order_id=order_id, from_status=status, to_status=to_status, changed_by=user, created_at=now)
+                for order_id, status in eligible
+            ])
+    return len(eligible), len(rows) - len(eligible)
@@ -0,0 +1,54 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import hashlib
+import math
+import time
+
+from django.core.cache import cache
+
+
+# ===================================================================
+# TOKEN BUCKET RATE LIMITER
+# ===================================================================
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets held in the shared cache, so every worker process draws from the same
+    bucket. Each key may burst up to `capacity` requests and regains `refill_rate` tokens per second.
+
+    A bucket is stored as the time (in ms) at which it will be full again, so taking a token is a
+    single incr(): the request is allowed while that time is at most `capacity` tokens ahead of now.
+    """
+    def __init__(self, name, capacity, refill_rate):
+        self.key_prefix = f'ratelimit:{name}:'
+        self.capacity = capacity
+        self.token_ms = round(1000 / refill_rate)
+        # An untouched bucket is full again after this long, the same as one that has expired
+        self.timeout = math.ceil(capacity / refill_rate)
+
+    def allow(self, key):
+        """Consumes one token for `key`. Returns False when the bucket is empty."""
+        # Hashed, since emails may hold characters memcached rejects in keys
+        cache_key = self.key_prefix + hashlib.sha256(key.encode()).hexdigest()
+        now = int(time.time() * 1000)
+        cache.add(cache_key, now, self.timeout)
+        try:
+            full_at = cache.incr(cache_key, self.token_ms)
+        except ValueError:
+            full_at = now  # expired between add() and incr()
+        if full_at - self.token_ms < now:
+            # The bucket had refilled completely; start it over from now
+            cache.set(cache_key, now + self.token_ms, self.timeout)
+            return True
+        allowed = full_at - now <= self.capacity * self.token_ms
+        if not allowed:
+            cache.decr(cache_key, self.token_ms)
+        # Backends without a native incr re-set the key with the default timeout
+        cache.touch(cache_key, self.timeout)
+        return allowed
+
+
+def client_ip(request):
+    """Returns the client address. X-Forwarded-For is ignored because clients can forge it."""
+    return request.META.get('REMOTE_ADDR', '')
@@ -0,0 +1,120 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from .models import Product, ProductImage, OrderItem, ArchivedOrderItem, ProductRecommendation
+
+
+# ===================================================================
+# RELATED-PRODUCT RECOMMENDATIONS
+# ===================================================================
+
+DEFAULT_TOP_N = 4
+
+
+def _top_n_per_row(matrix, n):
+    """Returns the column indices of the n highest-scoring entries in each CSR row."""
+    import numpy as np
+
+    top = []
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        cols, scores = matrix.indices[start:end], matrix.data[start:end]
+        if len(cols) > n:
+            keep = np.argpartition(-scores, n - 1)[:n]
+            cols, scores = cols[keep], scores[keep]
+        top.append(cols[np.argsort(-scores, kind='stable')].tolist())
+    return top
+
+
+def compute_recommendations(top_n=DEFAULT_TOP_N):
+    """
+    Computes "bought together" and "same category, similar price" neighbours for every product.
+    Returns a dict of product id -> (bought_together_ids, similar_ids).
+    """
+    import numpy as np
+    from scipy import sparse
+
+    products = list(Product.objects.values_list('id', 'category_id', 'price'))
+    if not products:
+        return {}
+    product_ids = np.array([p[0] for p in products], dtype=np.int64)
+    index_of = {pid: i for i, pid in enumerate(product_ids.tolist())}
+    n_products = len(product_ids)
+
+    # --- Bought together: product x product co-occurrence from order lines ---
+    # Archived orders keep their original ids, so both tables share one basket numbering
+    order_lines = chain(
+        OrderItem.objects.values_list('order_id', 'product_id').distinct(),
+        ArchivedOrderItem.objects.values_list('order_id', 'product_id').distinct(),
+    )
+    lines = [(o, index_of[p]) for o, p in order_lines if p in index_of]
+    if lines:
+        order_index = {}
+        rows = np.array([order_index.setdefault(o, len(order_index)) for o, _ in lines], dtype=np.int64)
+        cols = np.array([p for _, p in lines], dtype=np.int64)
+        baskets = sparse.csr_matrix((np.ones(len(lines), dtype=np.float32), (rows, cols)), shape=(len(order_index), n_products))
+        co_occurrence = (baskets.T @ baskets).tocsr()
+        co_occurrence.setdiag(0)
+        co_occurrence.eliminate_zeros()
+    else:
+        co_occurrence = sparse.csr_matrix((n_products, n_products), dtype=np.float32)
+
+    # --- Similar: same category, scored by closeness of log-price ---
+    # The score only falls as the price gap grows, so a product's top_n lie among the top_n
+    # neighbours on each side of it in its category sorted by price. Only those pairs are
+    # scored, rather than every pair in the category.
+    category_ids = np.array([p[1] for p in products], dtype=np.int64)
+    log_prices = np.log1p(np.array([float(p[2]) for p in products], dtype=np.float64))
+    by_category_price = np.lexsort((log_prices, category_ids))
+    pair_rows, pair_cols = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    for offset in range(1, min(top_n, n_products - 1) + 1):
+        left, right = by_category_price[:-offset], by_category_price[offset:]
+        same = category_ids[left] == category_ids[right]
+        pair_rows += [left[same], right[same]]
+        pair_cols += [right[same], left[same]]
+    pair_rows, pair_cols = np.concatenate(pair_rows), np.concatenate(pair_cols)
+    price_scores = 1.0 / (1.0 + np.abs(log_prices[pair_rows] - log_prices[pair_cols]))
+    similarity = sparse.csr_matrix((price_scores, (pair_rows, pair_cols)), shape=(n_products, n_products))
+
+    bought_together = _top_n_per_row(co_occurrence, top_n)
+    similar = _top_n_per_row(similarity, top_n)
+    return {
+        int(product_ids[i]): (product_ids[bought_together[i]].tolist(), product_ids[similar[i]].tolist())
+        for i in range(n_products)
+    }
+
+
+def rebuild_recommendations(top_n=DEFAULT_TOP_N):
+    """Recomputes recommendations and replaces the stored table in one transaction."""
+    results = compute_recommendations(top_n=top_n)
+    rows = [
+        ProductRecommendation(product_id=pid, bought_together_ids=together, similar_ids=similar)
+        for pid, (together, similar) in results.items()
+    ]
+    with transaction.atomic():
+        ProductRecommendation.objects.all().delete()
+        ProductRecommendation.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def get_related_products(product, limit=DEFAULT_TOP_N):
+    """
+    Returns related products for the detail page using the precomputed table, falling back to
+    other products in the same category when no row exists yet. Load `product` with
+    select_related('recommendation') and this is one query; each product's card image is
+    annotated as `first_image`.
+    """
+    first_image = ProductImage.objects.filter(product=OuterRef('pk')).order_by('id').values('image')[:1]
+    products = Product.objects.annotate(first_image=Subquery(first_image))
+    try:
+        recommendation = product.recommendation
+    except ProductRecommendation.DoesNotExist:
+        return products.filter(category_id=product.category_id).exclude(id=product.id)[:limit]
+    related_ids = list(dict.fromkeys(recommendation.bought_together_ids + recommendation.similar_ids))[:limit]
+    products_by_id = products.in_bulk(related_ids)
+    return [products_by_id[pid] for pid in related_ids if pid in products_by_id]
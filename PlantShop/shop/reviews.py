@@ -0,0 +1,84 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Count
+
+from .models import Product, Review
+from .workers import BatchWorker
+from . import metrics
+from .api import invalidate_catalog_api
+
+
+# ===================================================================
+# REVIEW SUBMISSION
+# ===================================================================
+
+REVIEWS_PER_PAGE = 10
+MAX_COMMENT_LENGTH = 5000
+
+
+def submit_review(product, user, rating, comment):
+    """
+    Validates and stores a review. A user has at most one review per product, so
+    resubmitting replaces the earlier rating and comment. Returns (review, created).
+    Raises ValidationError for a missing comment or a rating outside 1-5.
+    """
+    try:
+        rating = int(rating)
+    except (TypeError, ValueError):
+        raise ValidationError("Please choose a rating between 1 and 5 stars.")
+    if not 1 <= rating <= 5:
+        raise ValidationError("Please choose a rating between 1 and 5 stars.")
+    comment = (comment or '').strip()
+    if not comment:
+        raise ValidationError("Please write a comment for your review.")
+    if len(comment) > MAX_COMMENT_LENGTH:
+        raise ValidationError(f"Reviews are limited to {MAX_COMMENT_LENGTH} characters.")
+    return Review.objects.update_or_create(product=product, user=user, defaults={'rating': rating, 'comment': comment})
+
+
+def approved_reviews(product):
+    """Returns the product's approved reviews, newest first, with reviewers joined in."""
+    return product.reviews.filter(is_approved=True).select_related('user').order_by('-created_at')
+
+
+# ===================================================================
+# BACKGROUND AGGREGATE REFRESH
+# ===================================================================
+
+def refresh_review_aggregates(product_ids):
+    """Recomputes stored rating aggregates for the given products with one grouped query."""
+    product_ids = set(product_ids)
+    histograms = {product_id: [0] * 5 for product_id in product_ids}
+    rows = (
+        Review.objects.filter(product_id__in=product_ids, is_approved=True)
+        .values_list('product_id', 'rating').annotate(n=Count('id')).order_by()
+    )
+    for product_id, rating, count in rows:
+        if 1 <= rating <= 5:
+            histograms[product_id][rating - 1] = count
+
+    products = list(Product.objects.filter(id__in=product_ids).only('id'))
+    for product in products:
+        histogram = histograms[product.id]
+        total = sum(histogram)
+        product.rating_count = total
+        product.rating_average = sum(star * n for star, n in zip(range(1, 6), histogram)) / total if total else 0
+        product.rating_histogram = histogram
+    Product.objects.bulk_update(products, ['rating_average', 'rating_count', 'rating_histogram'])
+    invalidate_catalog_api()
+
+
+aggregate_worker = BatchWorker(
+    'review-aggregates', refresh_review_aggregates,
+    batch_size=200, flush_interval=getattr(settings, 'REVIEW_AGGREGATE_FLUSH_INTERVAL', 2.0),
+)
+metrics.register_gauge('leafcart_review_aggregate_queue_depth', "Product rating refreshes waiting to run.", lambda: aggregate_worker.depth)
+
+
+def schedule_aggregate_refresh(product_id):
+    """Queues a rating refresh for a product; runs synchronously if the queue is full."""
+    if not aggregate_worker.put(product_id):
+        refresh_review_aggregates([product_id])
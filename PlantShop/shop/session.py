@@ -0,0 +1,33 @@
+# ===================================================================
+# SESSION STATE HELPERS
+# ===================================================================
+# Django only writes a session back when it was modified, so these helpers
+# touch the session only when the stored value actually changes. The coupon
+# is kept as its integer id under a short key.
+
+COUPON_KEY = 'cpn'
+# Sessions from before the short key hold the coupon here; it is moved over on first read
+LEGACY_COUPON_KEY = 'coupon_id'
+
+
+def get_coupon_id(session):
+    """Returns the id of the applied coupon, or None."""
+    if LEGACY_COUPON_KEY in session:
+        coupon_id = session.pop(LEGACY_COUPON_KEY)
+        if coupon_id is not None and COUPON_KEY not in session:
+            session[COUPON_KEY] = coupon_id
+    return session.get(COUPON_KEY)
+
+
+def set_coupon(session, coupon_id):
+    """Stores the applied coupon id; a no-op if it is already applied."""
+    if session.get(COUPON_KEY) != coupon_id:
+        session[COUPON_KEY] = coupon_id
+
+
+def clear_coupon(session):
+    """Removes the applied coupon; a no-op (and no session write) if none is set."""
+    for key in (COUPON_KEY, LEGACY_COUPON_KEY):
+        if key in session:
+            del session[key]
+
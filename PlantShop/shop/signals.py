@@ -0,0 +1,152 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import CartItem, Order, Product, ProductImage, Category, Review, User
+from .auth_backends import invalidate_user_snapshot
+from .order_history import invalidate_order_stats
+from .carts import invalidate_cart_count
+from .facets import invalidate_facet_index
+from .inventory import invalidate_stock_snapshot
+from .order_status import record_status_event
+from .api import invalidate_catalog_api
+from .db_metrics import install_sqlite_write_timer
+from . import suggestions, wishlist_alerts
+from .reviews import schedule_aggregate_refresh
+
+
+# ===================================================================
+# USER SIGNALS
+# ===================================================================
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    """
+    Drops the cached auth snapshot on any save, which includes set_password() + save() before
+    update_session_auth_hash(), so the next request rebuilds it with the new session hash.
+    """
+    invalidate_user_snapshot(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """A user's groups or direct permissions changed, from either side of the relation."""
+    if not reverse:
+        if action.startswith('post_'):
+            invalidate_user_snapshot(instance.pk)
+    elif action == 'pre_clear':
+        # clear() does not pass pk_set, so find the affected users before they are removed
+        field = 'groups' if sender is User.groups.through else 'user_permissions'
+        invalidate_user_snapshot(*User.objects.filter(**{field: instance}).values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_user_snapshot(*pk_set)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """A group's permissions changed; every member's cached permission set is stale."""
+    if action.startswith('post_'):
+        groups = pk_set if reverse else [instance.pk]
+        invalidate_user_snapshot(*User.objects.filter(groups__in=groups or ()).values_list('id', flat=True).distinct())
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    invalidate_user_snapshot(*User.objects.filter(groups=instance).values_list('id', flat=True))
+
+
+# ===================================================================
+# ORDER SIGNALS
+# ===================================================================
+
+@receiver([post_save, post_delete], sender=Order)
+def order_changed(sender, instance, **kwargs):
+    """Keeps the cached per-user order stats in sync with the Order table."""
+    invalidate_order_stats(instance.user_id)
+
+
+@receiver(post_save, sender=Order)
+def order_created(sender, instance, created, **kwargs):
+    """Opens the order's status timeline with its initial status."""
+    if created:
+        record_status_event(instance, '', user=instance.user)
+
+
+# ===================================================================
+# CART SIGNALS
+# ===================================================================
+
+@receiver([post_save, post_delete], sender=CartItem)
+def cart_item_changed(sender, instance, **kwargs):
+    """Keeps the cached cart badge count in sync, whichever device or job changed the cart."""
+    invalidate_cart_count(instance.user_id)
+
+
+# ===================================================================
+# PRODUCT SIGNALS
+# ===================================================================
+
+@receiver([post_save, post_delete], sender=Product)
+def product_changed(sender, instance, **kwargs):
+    """
+    Marks the in-memory facet index and stock snapshot stale after any catalog change. This waits
+    for the commit, or another worker could rebuild from the old rows and keep them.
+    """
+    transaction.on_commit(invalidate_facet_index)
+    transaction.on_commit(invalidate_stock_snapshot)
+    transaction.on_commit(invalidate_catalog_api)
+    suggestions.product_changed(instance, deleted=kwargs['signal'] is post_delete)
+
+
+@receiver(pre_save, sender=Product)
+def product_saving(sender, instance, **kwargs):
+    """Remembers the stored stock, availability and price so post_save can spot restocks and price drops."""
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = Product.objects.filter(pk=instance.pk).values('stock', 'is_available', 'price').first()
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    """Queues wishlist alerts for products that came back in stock or got cheaper."""
+    wishlist_alerts.product_saved(instance, getattr(instance, '_previous_state', None))
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=Category)
+def catalog_changed(sender, instance, **kwargs):
+    """Images and category names are part of the catalog API responses."""
+    transaction.on_commit(invalidate_catalog_api)
+    if sender is Category:
+        # Activating or hiding a category changes which of its products are suggested
+        transaction.on_commit(suggestions.invalidate_suggestion_index)
+
+
+# ===================================================================
+# REVIEW SIGNALS
+# ===================================================================
+
+@receiver([post_save, post_delete], sender=Review)
+def review_changed(sender, instance, **kwargs):
+    """
+    Queues a refresh of the product's stored rating aggregates once the review commits, so the
+    worker never recomputes from rows it cannot see yet.
+    """
+    product_id = instance.product_id
+    transaction.on_commit(lambda: schedule_aggregate_refresh(product_id))
+
+
+# ===================================================================
+# DATABASE SIGNALS
+# ===================================================================
+
+@receiver(connection_created)
+def database_connected(sender, connection, **kwargs):
+    """Times write statements on SQLite connections for the lock-wait metrics."""
+    install_sqlite_write_timer(connection)
@@ -0,0 +1,103 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import base64
+import json
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from .models import Product
+
+
+# ===================================================================
+# PRODUCT SORT ORDERS
+# ===================================================================
+# Each sort is a list of (field, descending) columns ending in the id, so the
+# order is total: pages never overlap and can be walked with a keyset cursor.
+# Every order is backed by a Product index, so a sorted page is one index scan.
+
+PRODUCT_SORTS = {
+    'price_asc': (('price', False), ('id', False)),
+    'price_desc': (('price', True), ('id', True)),
+    'name_asc': (('name', False), ('id', False)),
+    'rating': (('rating_average', True), ('rating_count', True), ('id', True)),
+    'reviews': (('rating_count', True), ('rating_average', True), ('id', True)),
+    'bestseller': (('is_bestseller', True), ('created_at', True), ('id', True)),
+    'newest': (('created_at', True), ('id', True)),
+}
+# Sorts that only make sense over products that can be bought right now
+IN_STOCK_SORTS = {'newest'}
+
+SORT_LABELS = (
+    ('default', 'Default Sorting'),
+    ('rating', 'Top Rated'),
+    ('reviews', 'Most Reviewed'),
+    ('bestseller', 'Bestsellers First'),
+    ('newest', 'Newest In Stock'),
+    ('price_asc', 'Price: Low to High'),
+    ('price_desc', 'Price: High to Low'),
+    ('name_asc', 'Name: A-Z'),
+)
+
+
+def sort_ordering(sort):
+    """Returns order_by() arguments for a sort key."""
+    return [f"-{field}" if descending else field for field, descending in PRODUCT_SORTS[sort]]
+
+
+# ===================================================================
+# KEYSET CURSORS
+# ===================================================================
+
+def _encode_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(sort, row):
+    """Builds an opaque cursor from the sort columns of the last row on a page."""
+    values = [_encode_value(row[field]) for field, _ in PRODUCT_SORTS[sort]]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(sort, cursor):
+    """
+    Returns the cursor's column values, converted to each column's type. Raises ValueError if the
+    cursor is malformed, so a forged cursor is a bad request rather than a database error.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+    columns = PRODUCT_SORTS[sort]
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor.")
+    decoded = []
+    for (field, _), value in zip(columns, values):
+        if value is None or isinstance(value, (list, dict)):
+            raise ValueError("Invalid cursor.")
+        try:
+            decoded.append(Product._meta.get_field(field).to_python(value))
+        except ValidationError:
+            raise ValueError("Invalid cursor.")
+    return decoded
+
+
+def after_cursor(sort, values):
+    """
+    Returns a filter for rows strictly after `values` in the sort order:
+    (a > x) OR (a = x AND b > y) OR ..., with < for descending columns.
+    """
+    columns = PRODUCT_SORTS[sort]
+    condition = Q()
+    for i, (field, descending) in enumerate(columns):
+        step = Q(**{f"{field}__{'lt' if descending else 'gt'}": values[i]})
+        for j, (previous_field, _) in enumerate(columns[:i]):
+            step &= Q(**{previous_field: values[j]})
+        condition |= step
+    return condition
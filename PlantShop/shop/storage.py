@@ -0,0 +1,92 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import gzip
+import hashlib
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage
+
+
+# ===================================================================
+# PRECOMPRESSED MANIFEST STORAGE
+# ===================================================================
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.ico', '.eot', '.ttf', '.otf')
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest-hashed static storage that also writes `.gz` and `.br` siblings for text assets
+    during collectstatic, so the static middleware can serve them without compressing per request.
+    Variants that would not be smaller than the original are not written.
+    """
+    # Missing url() targets in vendor CSS (e.g. owl.carousel's video icon) shouldn't abort collectstatic.
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files) | set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self._write_compressed_variants(name)
+
+    def _write_compressed_variants(self, name):
+        # Imported here, as this module is also loaded at startup for the default (media) storage
+        try:
+            import brotli
+        except ImportError:  # Brotli variants are skipped when the package is not installed
+            brotli = None
+
+        with self.open(name) as original:
+            content = original.read()
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content, quality=11)))
+        for suffix, compressed in variants:
+            if len(compressed) < len(content):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            # Referenced file does not exist; keep the original reference untouched.
+            return name
+
+
+# ===================================================================
+# CONTENT-HASHED MEDIA STORAGE
+# ===================================================================
+
+class ContentHashedFileSystemStorage(FileSystemStorage):
+    """
+    Saves uploads as `name.<12 hex digits of their MD5>.ext`, the same shape as manifest static
+    names, so shop.middleware.MediaFilesMiddleware can cache them as immutable. A new image gets
+    a new URL; uploading identical content again reuses the stored file.
+    """
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def hashed_name(self, name, content):
+        digest = hashlib.md5(usedforsecurity=False)
+        if content.seekable():
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if content.seekable():
+            content.seek(0)
+        root, ext = os.path.splitext(name)
+        return f"{root}.{digest.hexdigest()[:12]}{ext}"
@@ -0,0 +1,191 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from heapq import nsmallest
+
+from django.db import transaction
+
+from .cache_versions import bump_version, get_version
+from .models import Category, Product
+
+
+# ===================================================================
+# PREFIX INDEX
+# ===================================================================
+# Every word start in a product or category name is one entry, so "pla"
+# finds both "Plant Stand" and "Snake Plant". An entry is packed into a
+# single int (slot << 8 | character offset) and the entries are kept in an
+# array sorted by the name text from that offset, which bisect searches
+# directly. Names are interned and per-slot data lives in arrays, so each
+# word costs 8 bytes instead of its own string: 100k products with 4 words
+# each take about 40 MB per worker, most of it the names themselves.
+
+PRODUCT, CATEGORY = 0, 1
+MAX_OFFSET = 255
+MAX_CANDIDATES = 500
+SUGGESTION_VERSION_KEY = 'suggestion_index_version'
+WORD_START_RE = re.compile(r'(?:^|(?<=[\s\-/&(]))\w', re.UNICODE)
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+def word_offsets(text):
+    return [m.start() for m in WORD_START_RE.finditer(text) if m.start() <= MAX_OFFSET]
+
+
+class SuggestionIndex:
+    def __init__(self):
+        self.entries = array('q')        # sorted packed (slot, offset) pairs
+        self.kinds = array('b')          # per slot: PRODUCT or CATEGORY
+        self.ids = array('q')            # per slot: database id (0 once removed)
+        self.ranks = array('q')          # per slot: popularity used to order matches
+        self.keys = []                   # per slot: normalized name, interned
+        self.names = []                  # per slot: display name, interned
+        self.slots = {}                  # slot_key(kind, id) -> slot
+
+    @classmethod
+    def build(cls):
+        index = cls()
+        products = Product.objects.filter(is_available=True, category__is_active=True).values_list('id', 'name', 'rating_count', 'is_bestseller')
+        for product_id, name, rating_count, is_bestseller in products.iterator():
+            index._add_slot(PRODUCT, product_id, name, product_rank(rating_count, is_bestseller))
+        for category_id, name in Category.objects.filter(is_active=True).values_list('id', 'name'):
+            index._add_slot(CATEGORY, category_id, name, 0)
+        packed = [(slot << 8) | offset for slot, key in enumerate(index.keys) for offset in word_offsets(key)]
+        packed.sort(key=index._entry_text)
+        index.entries = array('q', packed)
+        return index
+
+    def _entry_text(self, entry):
+        return self.keys[entry >> 8][entry & 0xFF:]
+
+    def _add_slot(self, kind, object_id, name, rank):
+        slot = len(self.ids)
+        self.kinds.append(kind)
+        self.ids.append(object_id)
+        self.ranks.append(rank)
+        self.keys.append(sys.intern(normalize(name)))
+        self.names.append(sys.intern(name))
+        self.slots[slot_key(kind, object_id)] = slot
+        return slot
+
+    # --- Incremental updates, applied from model signals ---
+
+    def has(self, kind, object_id):
+        return slot_key(kind, object_id) in self.slots
+
+    def remove(self, kind, object_id):
+        slot = self.slots.pop(slot_key(kind, object_id), None)
+        if slot is None:
+            return
+        for offset in word_offsets(self.keys[slot]):
+            entry = (slot << 8) | offset
+            i = bisect_left(self.entries, self._entry_text(entry), key=self._entry_text)
+            while self.entries[i] != entry:
+                i += 1
+            del self.entries[i]
+        # The slot is left empty rather than renumbered; a full rebuild compacts it
+        self.ids[slot] = 0
+        self.keys[slot] = self.names[slot] = ''
+
+    def upsert(self, kind, object_id, name, rank=0):
+        self.remove(kind, object_id)
+        slot = self._add_slot(kind, object_id, name, rank)
+        for offset in word_offsets(self.keys[slot]):
+            entry = (slot << 8) | offset
+            self.entries.insert(bisect_left(self.entries, self._entry_text(entry), key=self._entry_text), entry)
+
+    # --- Lookups ---
+
+    def suggest(self, prefix, limit=5):
+        """Returns ([(product id, name)], [(category id, name)]) best matching `prefix`."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return [], []
+        start = bisect_left(self.entries, prefix, key=self._entry_text)
+        end = bisect_left(self.entries, prefix + '\U0010ffff', lo=start, key=self._entry_text)
+        best = {}
+        for entry in self.entries[start:min(end, start + MAX_CANDIDATES)]:
+            slot, offset = entry >> 8, entry & 0xFF
+            # Whole-name prefix matches beat mid-name word matches; then popularity, then name
+            score = (offset != 0, -self.ranks[slot], self.keys[slot])
+            if slot not in best or score < best[slot]:
+                best[slot] = score
+        results = []
+        for kind in (PRODUCT, CATEGORY):
+            slots = nsmallest(limit, (slot for slot in best if self.kinds[slot] == kind), key=best.get)
+            results.append([(self.ids[slot], self.names[slot]) for slot in slots])
+        return results[0], results[1]
+
+
+def slot_key(kind, object_id):
+    """Packs (kind, id) into one int so the slot map holds no tuples."""
+    return (object_id << 1) | kind
+
+
+def product_rank(rating_count, is_bestseller):
+    return rating_count + (1000 if is_bestseller else 0)
+
+
+# ===================================================================
+# PROCESS-WIDE INDEX
+# ===================================================================
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_suggestion_index():
+    """Returns this worker's index, rebuilding it if another worker changed the catalog."""
+    global _index, _index_version
+    version = get_version(SUGGESTION_VERSION_KEY)
+    if _index is None or _index_version != version:
+        with _index_lock:
+            if _index is None or _index_version != version:
+                _index, _index_version = SuggestionIndex.build(), version
+    return _index
+
+
+def apply_change(kind, object_id, name=None, rank=0, category_id=None):
+    """
+    Updates this worker's index in place (name=None removes the entry) and bumps the shared
+    version so other workers rebuild. If this worker had already missed a change, it rebuilds too.
+    A product is only indexed while its `category_id` is, i.e. while the category is active.
+    """
+    global _index_version
+    version = bump_version(SUGGESTION_VERSION_KEY)
+    with _index_lock:
+        if _index is None or _index_version != version - 1:
+            return
+        if name is not None and category_id is not None and not _index.has(CATEGORY, category_id):
+            name = None
+        if name is None:
+            _index.remove(kind, object_id)
+        else:
+            _index.upsert(kind, object_id, name, rank)
+        _index_version = version
+
+
+def invalidate_suggestion_index():
+    """Marks every worker's index stale, e.g. after a category change that affects many products."""
+    bump_version(SUGGESTION_VERSION_KEY)
+
+
+def product_changed(product, deleted=False):
+    """
+    Applies one product save or delete to the index once the transaction commits, so no worker
+    rebuilds from rows that are about to change or roll back.
+    """
+    if deleted or not product.is_available:
+        change = (PRODUCT, product.id)
+    else:
+        change = (PRODUCT, product.id, product.name, product_rank(product.rating_count, product.is_bestseller), product.category_id)
+    transaction.on_commit(lambda: apply_change(*change))
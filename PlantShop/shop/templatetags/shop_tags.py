@@ -0,0 +1,45 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from django import template
+from django.core.paginator import Paginator
+from django.utils.html import conditional_escape
+
+from ..inventory import stock_level as lookup_stock_level
+
+
+register = template.Library()
+
+
+# ===================================================================
+# INVENTORY FILTERS
+# ===================================================================
+
+@register.filter
+def stock_level(product):
+    """
+    Returns the product's StockLevel (available, in_stock, low) from the in-memory snapshot.
+    Usage: {% with level=product|stock_level %}{% if level.in_stock %}...{% endwith %}
+    """
+    return lookup_stock_level(getattr(product, 'id', product))
+
+
+# ===================================================================
+# PAGINATION
+# ===================================================================
+
+@register.inclusion_tag('pagination.html')
+def pagination(page_obj, filter_query='', on_each_side=2, on_ends=1):
+    """
+    Renders page links for a Page: the first and last pages, a window around the current page
+    and ellipses in between, so the markup is the same size whether there are 10 pages or 10,000.
+    The link prefix carrying the filters is built and escaped once here, not once per link.
+    Usage: {% pagination page_obj filter_query %}
+    """
+    page_base = conditional_escape(f"?{filter_query}&page=" if filter_query else "?page=")
+    return {
+        'page_obj': page_obj,
+        'page_base': page_base,
+        'page_range': page_obj.paginator.get_elided_page_range(page_obj.number, on_each_side=on_each_side, on_ends=on_ends),
+        'ellipsis': Paginator.ELLIPSIS,
+    }
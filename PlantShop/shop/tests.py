@@ -1,3 +1,972 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import loadgen
+from .auth_backends import CachedModelBackend
+from .contact_queue import _write_contacts, contact_worker, email_limiter
+from .facets import FacetIndex, FacetSelection, invalidate_facet_index
+from .inventory import InsufficientStock, available_quantity, decrement_stock, get_stock_snapshot, invalidate_stock_snapshot
+from .invoices import invoice_orders
+from .lifecycle import days_ago, purge_stale_carts
+from .middleware import HASHED_NAME_RE, IMMUTABLE_CACHE_CONTROL
+from .models import ArchivedOrder, ArchivedOrderItem, CartItem, Category, Contact, Order, OrderItem, OrderStatusEvent, Product, ProductAlert, ProductImage, ProductRecommendation, Review, User, Wishlist
+from .order_history import ORDER_HISTORY_PAGE_SIZE, get_order_stats
+from .order_status import transition_orders, validate_transition
+from .ratelimit import TokenBucketLimiter
+from .recommendations import compute_recommendations, get_related_products
+from .reviews import aggregate_worker, submit_review
+from .session import COUPON_KEY, clear_coupon, get_coupon_id, set_coupon
+from .sorting import SORT_LABELS, decode_cursor, encode_cursor
+from .suggestions import get_suggestion_index
+from .wishlist_alerts import claim_pending_alerts, deliver_pending_alerts
+
+
+def best_time(func, repeat=5):
+    """Fastest of `repeat` runs in seconds; the minimum is the least noisy timing."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+# Keeps test runs out of the cache the development server shares
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'leafcart-tests'}}
+
+
+# ===================================================================
+# PAGINATION COMPONENT
+# ===================================================================
+
+class PaginationTagTests(SimpleTestCase):
+    template = Template("{% load shop_tags %}{% pagination page_obj filter_query %}")
+
+    def render(self, page_count, number, filter_query='categories=3&sort=price_asc'):
+        page_obj = Paginator(range(page_count * 6), 6).get_page(number)
+        return self.template.render(Context({'page_obj': page_obj, 'filter_query': filter_query}))
+
+    def test_link_count_is_bounded(self):
+        html = self.render(5000, 2500)
+        # 1 .. 2498 2499 [2500] 2501 2502 .. 5000, plus previous/next
+        self.assertEqual(html.count('class="page-link"'), 11)
+        self.assertIn('href="?categories=3&amp;sort=price_asc&amp;page=2501"', html)
+        self.assertIn('href="?categories=3&amp;sort=price_asc&amp;page=5000"', html)
+        self.assertNotIn('page=1000"', html)
+
+    def test_without_filters(self):
+        html = self.render(3, 1, filter_query='')
+        self.assertIn('href="?page=2"', html)
+        self.assertNotIn('&laquo;', html)
+
+    def test_single_page_renders_nothing(self):
+        self.assertEqual(self.render(1, 1).strip(), '')
+
+    def test_render_time_does_not_grow_with_page_count(self):
+        few = best_time(lambda: [self.render(10, 5) for _ in range(50)])
+        many = best_time(lambda: [self.render(10000, 5000) for _ in range(50)])
+        self.assertLess(many, few * 3 + 0.01)
+
+
+# ===================================================================
+# FACET INDEX
+# ===================================================================
+
+class FacetIndexTests(SimpleTestCase):
+    # (id, category_id, price, stock, is_bestseller)
+    rows = [
+        (10, 1, Decimal('120'), 3, False),
+        (11, 1, Decimal('300'), 0, True),
+        (12, 2, Decimal('750'), 8, False),
+        (13, 2, Decimal('1500'), 1, True),
+    ]
+
+    def test_counts(self):
+        counts = FacetIndex(self.rows).counts(FacetSelection(categories=[2], in_stock=True))
+        # Category counts ignore the category filter itself, so siblings keep their counts
+        self.assertEqual(counts['categories'], {1: 1, 2: 2})
+        self.assertEqual(counts['prices'], {'under-250': 0, '250-500': 0, '500-1000': 1, '1000-plus': 1})
+        self.assertEqual(counts['bestseller'], 1)
+        self.assertEqual(counts['total'], 2)
+
+    def test_search_base(self):
+        index = FacetIndex(self.rows)
+        base = index.bitmap_for_ids([11, 13, 99])
+        self.assertEqual(base, 0b1010)
+        self.assertEqual(index.counts(FacetSelection(), base=base)['categories'], {1: 1, 2: 1})
+
+    def test_build_time_grows_linearly(self):
+        def rows(n):
+            return [(i, i % 7, Decimal(i % 1500), i % 3, i % 5 == 0) for i in range(n)]
+        small, large = rows(20000), rows(400000)
+        # 20x the products; OR-ing bit by bit into growing ints took well over 100x the time
+        ratio = best_time(lambda: FacetIndex(large), repeat=2) / best_time(lambda: FacetIndex(small), repeat=2)
+        self.assertLess(ratio, 50)
+
+
+# ===================================================================
+# SHOP PAGE WITH THOUSANDS OF RESULTS
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class ShopPageRenderTests(TestCase):
+    PRODUCT_COUNT = 3000
+    RENDER_BUDGET_SECONDS = 0.5
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Indoor Plants', image='Category_Images/indoor.png')
+        Product.objects.bulk_create([
+            Product(name=f'Plant {i:04d}', category=category, description='A plant.', price=Decimal(100 + i % 500))
+            for i in range(cls.PRODUCT_COUNT)
+        ])
+        cls.category = category
+
+    def setUp(self):
+        # bulk_create sends no signals, so drop any catalog snapshot built from another database
+        invalidate_facet_index()
+        invalidate_stock_snapshot()
+
+    def test_page_links_are_windowed(self):
+        response = self.client.get('/shop/', {'page': 250, 'sort': 'price_asc', 'categories': self.category.id})
+        self.assertEqual(response.status_code, 200)
+        html = response.content.decode()
+        # 500 pages of 6 products, but only the window around page 250 is linked
+        self.assertLessEqual(html.count('class="page-link"'), 11)
+        self.assertIn(f'categories={self.category.id}', html)
+        self.assertIn('page=251"', html)
+
+    def test_render_time(self):
+        params = {'page': 250, 'sort': 'price_asc'}
+        self.client.get('/shop/', params)  # builds the in-memory catalog indexes and compiles templates
+        elapsed = best_time(lambda: self.client.get('/shop/', params))
+        self.assertLess(elapsed, self.RENDER_BUDGET_SECONDS)
+
+
+# ===================================================================
+# CACHED AUTH SNAPSHOTS
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class CachedAuthSnapshotTests(TestCase):
+    password = 'Fern-and-moss-42'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ivy@example.com', self.password, full_name='Ivy Green')
+        self.client.force_login(self.user)
+        self.backend = CachedModelBackend()
+
+    def assertLoggedIn(self, client, logged_in=True):
+        response = client.get('/cart/')
+        self.assertEqual(response.status_code, 200 if logged_in else 302)
+
+    def can_edit_products(self):
+        return self.backend.get_user(self.user.pk).has_perm('shop.change_product')
+
+    def test_repeat_lookups_run_no_queries(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+            self.assertEqual(user.full_name, 'Ivy Green')
+            self.assertFalse(user.has_perm('shop.change_product'))
+
+    def test_async_views_run_no_user_query(self):
+        fern, = create_products(3)
+        self.assertLoggedIn(self.client)  # builds the snapshot
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.post(f'/wishlist/add/{fern.id}/').status_code, 302)
+            self.assertEqual(self.client.post(f'/wishlist/remove/{fern.id}/').status_code, 302)
+        self.assertEqual([q['sql'] for q in queries if 'FROM "shop_user"' in q['sql']], [])
+
+    def test_password_change_ends_other_sessions(self):
+        other_device = Client()
+        other_device.force_login(self.user)
+        self.assertLoggedIn(other_device)
+        self.client.post('/profile/change-password/', {
+            'current_password': self.password, 'new_password': 'Moss-and-fern-43', 'confirm_password': 'Moss-and-fern-43',
+        })
+        self.assertLoggedIn(self.client)
+        self.assertLoggedIn(other_device, False)
+
+    def test_deactivation_ends_sessions(self):
+        self.assertLoggedIn(self.client)
+        self.user.is_active = False
+        self.user.save()
+        self.assertLoggedIn(self.client, False)
+
+    def test_group_permission_changes(self):
+        permission = Permission.objects.get(codename='change_product')
+        group = Group.objects.create(name='Catalog editors')
+        self.user.groups.add(group)
+        self.assertFalse(self.can_edit_products())
+        group.permissions.add(permission)
+        self.assertTrue(self.can_edit_products())
+        group.permissions.remove(permission)
+        self.assertFalse(self.can_edit_products())
+        permission.group_set.add(group)
+        self.assertTrue(self.can_edit_products())
+        group.shop_user_set.remove(self.user)
+        self.assertFalse(self.can_edit_products())
+        self.user.groups.add(group)
+        self.assertTrue(self.can_edit_products())
+        group.delete()
+        self.assertFalse(self.can_edit_products())
+
+    def test_user_permission_changes(self):
+        permission = Permission.objects.get(codename='change_product')
+        self.assertFalse(self.can_edit_products())
+        self.user.user_permissions.add(permission)
+        self.assertTrue(self.can_edit_products())
+        permission.shop_user_permissions_set.clear()
+        self.assertFalse(self.can_edit_products())
+
+
+# ===================================================================
+# SESSION STATE AND CART BADGE
+# ===================================================================
+
+class CouponSessionTests(SimpleTestCase):
+    def test_unchanged_coupon_does_not_modify_session(self):
+        session = SessionStore()
+        session[COUPON_KEY] = 4
+        session.modified = False
+        set_coupon(session, 4)
+        self.assertEqual(get_coupon_id(session), 4)
+        self.assertFalse(session.modified)
+
+    def test_coupon_under_legacy_key_is_kept(self):
+        session = SessionStore()
+        session['coupon_id'] = 7
+        self.assertEqual(get_coupon_id(session), 7)
+        self.assertEqual(dict(session.items()), {COUPON_KEY: 7})
+        clear_coupon(session)
+        self.assertIsNone(get_coupon_id(session))
+
+    def test_legacy_failed_coupon_is_dropped(self):
+        session = SessionStore()
+        session['coupon_id'] = None
+        self.assertIsNone(get_coupon_id(session))
+        self.assertEqual(dict(session.items()), {})
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CartBadgeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('fern@example.com', 'Fern-and-moss-42', full_name='Fern Leaf')
+        category = Category.objects.create(name='Succulents', image='Category_Images/succulents.png')
+        self.product = Product.objects.create(name='Aloe', category=category, description='A plant.', price=Decimal('250'), stock=10)
+        self.client.force_login(self.user)
+
+    def badge(self):
+        return self.client.get('/cart/').context['cart_item_count']
+
+    def test_count_follows_changes_made_elsewhere(self):
+        self.assertEqual(self.badge(), 0)
+        # Another device adds to the same cart
+        item = CartItem.objects.create(user=self.user, product=self.product, quantity=3)
+        self.assertEqual(self.badge(), 3)
+        CartItem.objects.filter(id=item.id).update(updated_at=days_ago(60))
+        purge_stale_carts(days_ago(30))
+        self.assertEqual(self.badge(), 0)
+
+
+# ===================================================================
+# STOCK SNAPSHOT AND RESERVATION
+# ===================================================================
+
+def create_products(*stocks):
+    category = Category.objects.create(name='Ferns', image='Category_Images/ferns.png')
+    return [
+        Product.objects.create(name=f'Fern {i}', category=category, description='A plant.', price=Decimal('300'), stock=stock)
+        for i, stock in enumerate(stocks)
+    ]
+
+
+@override_settings(CACHES=TEST_CACHES)
+class StockReservationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.fern, self.moss = create_products(3, 1)
+
+    def stock(self, product):
+        product.refresh_from_db(fields=['stock'])
+        return product.stock
+
+    def test_checkouts_racing_on_one_snapshot(self):
+        # Both buyers pass the snapshot check before either reserves; only one reservation can succeed
+        snapshot = get_stock_snapshot()
+        self.assertTrue(snapshot.can_fulfil(self.fern.id, 2))
+        self.assertTrue(snapshot.can_fulfil(self.fern.id, 2))
+        with transaction.atomic():
+            decrement_stock({self.fern.id: 2})
+        with self.assertRaises(InsufficientStock) as raised, transaction.atomic():
+            decrement_stock({self.fern.id: 2})
+        self.assertEqual(raised.exception.product_id, self.fern.id)
+        self.assertEqual(self.stock(self.fern), 1)
+
+    def test_short_line_rolls_back_the_whole_order(self):
+        with self.assertRaises(InsufficientStock), transaction.atomic():
+            decrement_stock({self.fern.id: 1, self.moss.id: 2})
+        self.assertEqual((self.stock(self.fern), self.stock(self.moss)), (3, 1))
+
+    def test_commit_invalidates_snapshot(self):
+        self.assertEqual(get_stock_snapshot().quantity(self.fern.id), 3)
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            decrement_stock({self.fern.id: 3})
+        self.assertEqual(get_stock_snapshot().level(self.fern.id).in_stock, False)
+
+    def test_product_save_invalidates_snapshot(self):
+        self.assertEqual(get_stock_snapshot().quantity(self.moss.id), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.moss.is_available = False
+            self.moss.save()
+        self.assertEqual(get_stock_snapshot().quantity(self.moss.id), 0)
+
+    def test_stale_snapshot_is_rechecked_before_rejecting(self):
+        get_stock_snapshot()
+        # A restock that has not reached this snapshot, e.g. committed moments ago by another worker
+        Product.objects.filter(id=self.moss.id).update(stock=5)
+        self.assertEqual(get_stock_snapshot().quantity(self.moss.id), 1)
+        self.assertEqual(available_quantity(self.moss.id), 1)
+        self.assertEqual(available_quantity(self.moss.id, 4), 5)
+
+
+
+# ===================================================================
+# CATALOG API CACHING
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class CatalogEtagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.fern, = create_products(4)
+
+    def test_unchanged_catalog_is_not_modified(self):
+        etag = self.client.get('/api/products/')['ETag']
+        self.assertEqual(self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fern.name = 'Boston Fern'
+            self.fern.save()
+        response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_lost_version_does_not_reissue_old_etags(self):
+        etag = self.client.get('/api/products/')['ETag']
+        cache.clear()
+        self.assertNotEqual(self.client.get('/api/products/')['ETag'], etag)
+
+    @override_settings(ALLOWED_HOSTS=['10.0.0.10'])
+    def test_feed_links_each_product_page(self):
+        Product.objects.bulk_create([
+            Product(name=f'Moss {i}', category=self.fern.category, description='A plant.', price=Decimal('90'), stock=5) for i in range(10)
+        ])
+        response = self.client.get('/api/products/feed.ndjson', {'fields': 'name'}, headers={'host': '10.0.0.10:8000'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 11)
+        for row in rows:
+            self.assertEqual(row['url'], 'http://10.0.0.10:8000' + reverse('shop_details', args=[row['id']]))
+
+
+# ===================================================================
+# SEARCH SUGGESTIONS
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class SuggestionIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.fern, = create_products(2)
+        self.hidden = Category.objects.create(name='Archive', image='Category_Images/archive.png', is_active=False)
+
+    def product_names(self, prefix):
+        return [name for _, name in get_suggestion_index().suggest(prefix)[0]]
+
+    def test_saves_apply_after_commit_without_queries(self):
+        self.assertEqual(self.product_names('fern'), ['Fern 0'])
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.fern.name = 'Boston Fern'
+            self.fern.save()
+        self.assertEqual(self.product_names('bos'), [])
+        with self.assertNumQueries(0):
+            for callback in callbacks:
+                callback()
+            self.assertEqual(self.product_names('bos'), ['Boston Fern'])
+
+    def test_products_in_hidden_categories_are_not_suggested(self):
+        get_suggestion_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fern.category = self.hidden
+            self.fern.save()
+        self.assertEqual(self.product_names('fern'), [])
+
+    def test_delete_removes_product(self):
+        get_suggestion_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fern.delete()
+        self.assertEqual(self.product_names('fern'), [])
+
+
+# ===================================================================
+# WISHLIST
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class WishlistViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.fern, = create_products(5)
+        self.ivy = User.objects.create_user('ivy@example.com', 'Fern-and-moss-42', full_name='Ivy Green')
+
+    def test_add_and_remove_over_ajax(self):
+        self.client.login(email='ivy@example.com', password='Fern-and-moss-42')
+        for _ in range(2):
+            response = self.client.post(f'/wishlist/add/{self.fern.id}/', headers={'x-requested-with': 'XMLHttpRequest'})
+            self.assertEqual(response.json(), {'status': 'success'})
+        self.assertEqual(Wishlist.objects.filter(user=self.ivy, product=self.fern).count(), 1)
+        response = self.client.post(f'/wishlist/remove/{self.fern.id}/', headers={'x-requested-with': 'XMLHttpRequest'})
+        self.assertEqual(response.json(), {'status': 'success'})
+        self.assertFalse(Wishlist.objects.exists())
+        self.assertEqual(self.client.post('/wishlist/add/999999/').status_code, 404)
+
+    def test_anonymous_shoppers_are_sent_to_login(self):
+        for path in (f'/wishlist/add/{self.fern.id}/', f'/wishlist/remove/{self.fern.id}/'):
+            with self.subTest(path=path):
+                response = self.client.post(path, headers={'x-requested-with': 'XMLHttpRequest'})
+                self.assertRedirects(response, f'/login/?next={path}', fetch_redirect_response=False)
+        self.assertFalse(Wishlist.objects.exists())
+
+
+# ===================================================================
+# WISHLIST ALERTS
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class WishlistAlertTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.fern, self.moss = create_products(0, 5)
+        self.ivy = User.objects.create_user('ivy@example.com', 'Fern-and-moss-42', full_name='Ivy Green')
+        self.rose = User.objects.create_user('rose@example.com', 'Fern-and-moss-42', full_name='Rose Red')
+        former = User.objects.create_user('gone@example.com', 'Fern-and-moss-42', full_name='Gone', is_active=False)
+        Wishlist.objects.bulk_create([
+            Wishlist(user=self.ivy, product=self.fern), Wishlist(user=self.ivy, product=self.moss),
+            Wishlist(user=self.rose, product=self.fern), Wishlist(user=former, product=self.fern),
+        ])
+
+    def set_stock(self, product, stock):
+        product.stock = stock
+        product.save()
+
+    def pending(self):
+        return ProductAlert.objects.filter(processed_at__isnull=True).count()
+
+    def test_each_user_gets_one_message(self):
+        self.set_stock(self.fern, 4)
+        self.moss.price = Decimal('250')
+        self.moss.save()
+        self.assertEqual(deliver_pending_alerts(), 2)
+        subjects = {message.to[0]: message.subject for message in mail.outbox}
+        self.assertEqual(subjects, {
+            'ivy@example.com': '2 items on your wishlist have good news',
+            'rose@example.com': 'Fern 0 is back in stock',
+        })
+        self.assertEqual(self.pending(), 0)
+
+    def test_pending_alert_is_not_queued_twice(self):
+        self.set_stock(self.fern, 4)
+        self.set_stock(self.fern, 0)
+        self.set_stock(self.fern, 3)
+        self.assertEqual(ProductAlert.objects.filter(product=self.fern).count(), 1)
+        self.assertEqual(deliver_pending_alerts(), 2)
+
+    def test_cooldown(self):
+        self.set_stock(self.fern, 4)
+        deliver_pending_alerts()
+        self.set_stock(self.fern, 0)
+        self.set_stock(self.fern, 2)
+        self.assertEqual(self.pending(), 0)
+        ProductAlert.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.set_stock(self.fern, 0)
+        self.set_stock(self.fern, 2)
+        self.assertEqual(self.pending(), 1)
+
+    def test_failed_send_is_retried(self):
+        self.set_stock(self.fern, 4)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=SMTPException):
+            with self.assertRaises(SMTPException):
+                deliver_pending_alerts()
+        self.assertEqual(ProductAlert.objects.filter(processed_at__isnull=True, claimed_at__isnull=True).count(), 1)
+        self.assertEqual(deliver_pending_alerts(), 2)
+        self.assertEqual(self.pending(), 0)
+
+    def test_abandoned_claim_expires(self):
+        self.set_stock(self.fern, 4)
+        self.assertEqual(len(claim_pending_alerts()), 1)
+        # Claimed by a run that is still sending, or that died
+        self.assertEqual(claim_pending_alerts(), [])
+        ProductAlert.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(deliver_pending_alerts(), 2)
+
+
+# ===================================================================
+# RECOMMENDATIONS
+# ===================================================================
+
+class SimilarProductTests(TestCase):
+    def test_similar_products_are_nearest_in_price_within_the_category(self):
+        ferns = Category.objects.create(name='Ferns', image='Category_Images/ferns.png')
+        cacti = Category.objects.create(name='Cacti', image='Category_Images/cacti.png')
+        prices = [100, 120, 150, 400, 900, 2000]
+        products = Product.objects.bulk_create([
+            Product(name=f'Fern {price}', category=ferns, description='A plant.', price=Decimal(price)) for price in prices
+        ] + [Product(name='Cactus 130', category=cacti, description='A plant.', price=Decimal(130))])
+        fern = {product.price: product.id for product in products[:len(prices)]}
+        similar = {pid: ids for pid, (_, ids) in compute_recommendations(top_n=2).items()}
+        self.assertEqual(similar[fern[120]], [fern[100], fern[150]])
+        self.assertEqual(similar[fern[2000]], [fern[900], fern[400]])
+        self.assertEqual(similar[products[-1].id], [])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RelatedProductTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product, *self.others = create_products(5, 5, 5, 5)
+        ProductImage.objects.bulk_create([
+            ProductImage(product=self.others[1], image='Product_Images/fern-front.png'),
+            ProductImage(product=self.others[1], image='Product_Images/fern-back.png'),
+        ])
+
+    def related(self):
+        with self.assertNumQueries(1):
+            product = Product.objects.select_related('recommendation').get(id=self.product.id)
+        with self.assertNumQueries(1):
+            return [(related.id, related.first_image) for related in get_related_products(product)]
+
+    def test_precomputed_neighbours_in_one_query(self):
+        ProductRecommendation.objects.create(
+            product=self.product, bought_together_ids=[self.others[1].id, 999999], similar_ids=[self.others[1].id, self.others[0].id],
+        )
+        self.assertEqual(self.related(), [(self.others[1].id, 'Product_Images/fern-front.png'), (self.others[0].id, None)])
+
+    def test_category_fallback_in_one_query(self):
+        self.assertEqual(sorted(self.related()), sorted([
+            (self.others[0].id, None), (self.others[1].id, 'Product_Images/fern-front.png'), (self.others[2].id, None),
+        ]))
+
+
+# ===================================================================
+# CONTACT RATE LIMITS
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class ContactRateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_buckets_are_shared_between_processes(self):
+        # Two limiters with the same name stand in for two worker processes
+        first, second = TokenBucketLimiter('test', 2, 1 / 60), TokenBucketLimiter('test', 2, 1 / 60)
+        self.assertEqual([first.allow('ivy'), second.allow('ivy'), first.allow('ivy'), second.allow('fern')], [True, True, False, True])
+
+    def test_posts_past_the_email_bucket_are_not_saved(self):
+        queued = []
+        with mock.patch.object(contact_worker, 'put', side_effect=lambda contact: queued.append(contact) or True):
+            for i in range(email_limiter.capacity + 2):
+                # A new client IP each time, so only the per-email bucket applies
+                self.client.post('/contact/', {
+                    'name': 'Ivy', 'email': 'Ivy@Example.com ', 'subject': 'Repotting', 'message': f'Question {i}',
+                }, REMOTE_ADDR=f'203.0.113.{i}')
+        _write_contacts(queued)
+        self.assertEqual(Contact.objects.count(), email_limiter.capacity)
+
+
+# ===================================================================
+# REVIEWS
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class ReviewSubmissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product, = create_products(5)
+        self.user = User.objects.create_user('ivy@example.com', 'Fern-and-moss-42', full_name='Ivy Green')
+
+    def test_rating_must_be_between_one_and_five(self):
+        for rating in (0, 6, 'five', None):
+            with self.subTest(rating=rating), self.assertRaises(ValidationError):
+                submit_review(self.product, self.user, rating, 'Lovely fronds.')
+        with self.assertRaises(ValidationError):
+            submit_review(self.product, self.user, 4, '   ')
+        self.assertFalse(Review.objects.exists())
+
+    def test_resubmitting_updates_the_existing_review(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            _, created = submit_review(self.product, self.user, 2, 'Arrived droopy.')
+            review, recreated = submit_review(self.product, self.user, '5', 'Perked right up.')
+        self.assertEqual((created, recreated), (True, False))
+        self.assertEqual(list(Review.objects.values_list('rating', 'comment')), [(5, 'Perked right up.')])
+
+    def test_aggregates_refresh_after_the_review_commits(self):
+        # A full queue makes the refresh run inline, which shows exactly when it was scheduled
+        with mock.patch.object(aggregate_worker, 'put', return_value=False):
+            with self.captureOnCommitCallbacks(execute=True):
+                submit_review(self.product, self.user, 4, 'Lovely fronds.')
+                self.product.refresh_from_db()
+                self.assertEqual(self.product.rating_count, 0)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating_average), (1, 4))
+        self.assertEqual(self.product.rating_histogram, [0, 0, 0, 1, 0])
+
+
+# ===================================================================
+# ORDER STATUS
+# ===================================================================
+
+def create_orders(user, *statuses):
+    return [
+        Order.objects.create(
+            user=user, full_name=user.full_name, email=user.email, phone='0400 000 000', address='1 Moss Lane',
+            city='Hobart', state='TAS', postcode='7000', total_price=Decimal('300'), status=status,
+        )
+        for status in statuses
+    ]
+
+
+@override_settings(CACHES=TEST_CACHES)
+class OrderTransitionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ivy@example.com', 'Fern-and-moss-42', full_name='Ivy Green')
+
+    def test_only_allowed_transitions_are_applied(self):
+        pending, processing, delivered = create_orders(self.user, 'Pending', 'Processing', 'Delivered')
+        changed, skipped = transition_orders(Order.objects.all(), 'Cancelled', user=self.user)
+        self.assertEqual((changed, skipped), (2, 1))
+        statuses = dict(Order.objects.values_list('id', 'status'))
+        self.assertEqual(statuses, {pending.id: 'Cancelled', processing.id: 'Cancelled', delivered.id: 'Delivered'})
+        with self.assertRaises(ValidationError):
+            validate_transition('Delivered', 'Pending')
+        with self.assertRaises(ValidationError):
+            transition_orders(Order.objects.all(), 'Lost')
+
+    def test_each_change_writes_one_history_row(self):
+        pending, shipped = create_orders(self.user, 'Pending', 'Shipped')
+        transition_orders(Order.objects.all(), 'Processing', user=self.user)
+        events = OrderStatusEvent.objects.exclude(from_status='')
+        self.assertEqual(list(events.values_list('order_id', 'from_status', 'to_status', 'changed_by')), [
+            (pending.id, 'Pending', 'Processing', self.user.id),
+        ])
+        self.assertEqual(shipped.status_events.count(), 1)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        counts = []
+        for size in (2, 20):
+            create_orders(self.user, *['Pending'] * size)
+            with CaptureQueriesContext(connection) as queries:
+                changed, _ = transition_orders(Order.objects.filter(status='Pending'), 'Processing')
+            self.assertEqual(changed, size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+# ===================================================================
+# ORDER ARCHIVAL
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class OrderArchivalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ivy@example.com', 'Fern-and-moss-42', full_name='Ivy Green')
+        self.old_delivered, self.old_pending, self.new_delivered = create_orders(self.user, 'Delivered', 'Pending', 'Delivered')
+        product, = create_products(5)
+        OrderItem.objects.create(order=self.old_delivered, product=product, quantity=2, price=Decimal('150'))
+        Order.objects.filter(id__in=[self.old_delivered.id, self.old_pending.id]).update(created_at=days_ago(400), status_changed_at=None)
+        call_command('data_lifecycle', stdout=StringIO())
+
+    def test_purge_archives_only_finished_old_orders(self):
+        self.assertEqual(list(ArchivedOrder.objects.values_list('id', flat=True)), [self.old_delivered.id])
+        self.assertEqual(list(ArchivedOrderItem.objects.values_list('order_id', 'quantity')), [(self.old_delivered.id, 2)])
+        self.assertEqual(set(Order.objects.values_list('id', flat=True)), {self.old_pending.id, self.new_delivered.id})
+
+    def test_archived_orders_stay_visible_to_their_owner(self):
+        self.client.login(email='ivy@example.com', password='Fern-and-moss-42')
+        orders = self.client.get('/profile/').context['orders']
+        self.assertEqual([order.id for order in orders], [self.new_delivered.id, self.old_pending.id, self.old_delivered.id])
+        response = self.client.get(f'/order/confirmation/{self.old_delivered.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.context['order'], ArchivedOrder)
+        self.assertContains(response, f'#{self.old_delivered.id}')
+
+
+# ===================================================================
+# ORDER HISTORY AND INVOICES
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class OrderHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ivy@example.com', 'Fern-and-moss-42', full_name='Ivy Green')
+        self.product, = create_products(5)
+        self.client.login(email='ivy@example.com', password='Fern-and-moss-42')
+
+    def place_orders(self, count):
+        orders = create_orders(self.user, *['Delivered'] * count)
+        OrderItem.objects.bulk_create([OrderItem(order=order, product=self.product, quantity=1, price=Decimal('300')) for order in orders])
+        return orders
+
+    def test_history_pages_through_every_order(self):
+        ids = sorted((order.id for order in self.place_orders(ORDER_HISTORY_PAGE_SIZE + 2)), reverse=True)
+        response = self.client.get('/profile/')
+        self.assertEqual([order.id for order in response.context['orders']], ids[:ORDER_HISTORY_PAGE_SIZE])
+        more = self.client.get('/profile/orders/', {'before': response.context['next_cursor']}).json()
+        self.assertIsNone(more['next_cursor'])
+        for order_id in ids[ORDER_HISTORY_PAGE_SIZE:]:
+            self.assertIn(f'#{order_id}<', more['html'])
+        self.assertEqual(self.client.get('/profile/orders/', {'before': 'latest'}).status_code, 400)
+
+    def test_profile_queries_do_not_grow_with_the_order_count(self):
+        counts = []
+        for count in (2, ORDER_HISTORY_PAGE_SIZE):
+            self.place_orders(count)
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get('/profile/')
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_order_stats_are_cached_until_an_order_changes(self):
+        self.place_orders(2)
+        self.assertEqual(get_order_stats(self.user.id), {'order_count': 2, 'lifetime_total': Decimal('600')})
+        with self.assertNumQueries(0):
+            get_order_stats(self.user.id)
+        self.place_orders(1)
+        self.assertEqual(get_order_stats(self.user.id)['order_count'], 3)
+
+    def test_invoice_loads_lines_in_one_extra_query(self):
+        order, = self.place_orders(1)
+        OrderItem.objects.bulk_create([OrderItem(order=order, product=self.product, quantity=2, price=Decimal('300')) for _ in range(2)])
+        with self.assertNumQueries(2):
+            order = invoice_orders().get(id=order.id)
+            render_to_string('invoice.html', {'order': order})
+
+
+# ===================================================================
+# KEYSET PAGING
+# ===================================================================
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip_keeps_column_types(self):
+        created = timezone.now()
+        row = {'price': Decimal('249.50'), 'created_at': created, 'rating_average': 4.5, 'rating_count': 12, 'id': 7}
+        self.assertEqual(decode_cursor('price_asc', encode_cursor('price_asc', row)), [Decimal('249.50'), 7])
+        self.assertEqual(decode_cursor('newest', encode_cursor('newest', row)), [created, 7])
+        self.assertEqual(decode_cursor('rating', encode_cursor('rating', row)), [4.5, 12, 7])
+
+    def test_forged_cursors_are_rejected(self):
+        forged = encode_cursor('name_asc', {'name': 'a', 'id': 'b'})
+        for sort, cursor in [('rating', 'WyJhIiwiYiIsImMiXQ'), ('name_asc', forged), ('price_asc', 'not base64!'), ('newest', 'WzEsMiwzXQ')]:
+            with self.subTest(sort=sort, cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(sort, cursor)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ProductApiPagingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        products = create_products(*[5] * 8)
+        # Three two-way rating ties, so the id tiebreaker decides the order inside each pair
+        for product, (average, count) in zip(products, [(4.5, 2), (4.5, 2), (3.0, 1), (3.0, 1), (5.0, 9), (5.0, 9), (1.0, 1), (2.0, 1)]):
+            Product.objects.filter(id=product.id).update(rating_average=average, rating_count=count)
+        self.expected = list(Product.objects.order_by('-rating_average', '-rating_count', '-id').values_list('id', flat=True))
+
+    def test_pages_follow_sort_order_without_gaps_or_repeats(self):
+        seen, url, params = [], '/api/products/', {'sort': 'rating', 'limit': 3, 'fields': 'id'}
+        while url:
+            data = self.client.get(url, params).json()
+            seen += [row['id'] for row in data['results']]
+            url, params = data['next'], None
+        self.assertEqual(seen, self.expected)
+
+    def test_forged_cursor_is_a_bad_request(self):
+        response = self.client.get('/api/products/', {'sort': 'rating', 'cursor': 'WyJhIiwiYiIsImMiXQ'})
+        self.assertEqual(response.status_code, 400)
+
+
+# ===================================================================
+# MEDIA FILES
+# ===================================================================
+
+class MediaFilesTests(SimpleTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        media_root = os.path.join(temp_dir.name, 'Media')
+        os.mkdir(media_root)
+        self.body = bytes(range(100))
+        with open(os.path.join(media_root, 'fern.png'), 'wb') as file:
+            file.write(self.body)
+        with open(os.path.join(temp_dir.name, 'secret.txt'), 'w') as file:
+            file.write('not for download')
+        settings_override = override_settings(MEDIA_ROOT=media_root, MEDIA_ACCEL_REDIRECT=None)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get(self, path='/media/fern.png', **headers):
+        response = self.client.get(path, headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_byte_ranges(self):
+        for header, status, content_range, body in [
+            ('bytes=10-19', 206, 'bytes 10-19/100', self.body[10:20]),
+            ('bytes=-5', 206, 'bytes 95-99/100', self.body[95:]),
+            ('bytes=90-', 206, 'bytes 90-99/100', self.body[90:]),
+            ('bytes=200-300', 416, 'bytes */100', b''),
+        ]:
+            with self.subTest(range=header):
+                response = self.get(range=header)
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(response.headers['Content-Range'], content_range)
+                self.assertEqual(b''.join(response.streaming_content) if response.streaming else response.content, body)
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.get().headers['ETag']
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+        self.assertEqual(self.get(if_none_match='"stale"').status_code, 200)
+
+    def test_stale_if_range_sends_the_whole_file(self):
+        response = self.get(range='bytes=10-19', if_range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+
+    def test_paths_outside_media_root_are_not_served(self):
+        for path in ('/media/../secret.txt', '/media/%2E%2E/secret.txt'):
+            with self.subTest(path=path):
+                response = self.get(path)
+                self.assertEqual(response.status_code, 404)
+                self.assertNotIn(b'not for download', response.content)
+
+
+# ===================================================================
+# STATIC FILES
+# ===================================================================
+
+class StaticPipelineTests(SimpleTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        source, self.static_root = os.path.join(temp_dir.name, 'static'), os.path.join(temp_dir.name, 'staticfiles')
+        for name, content in [('css/leaf.css', 'body { color: green; }\n' * 200), ('scss/leaf.scss', '$green: #2e7d32;')]:
+            os.makedirs(os.path.join(source, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(source, name), 'w') as file:
+                file.write(content)
+        storages = {**settings.STORAGES, 'staticfiles': {'BACKEND': 'shop.storage.CompressedManifestStaticFilesStorage'}}
+        settings_override = override_settings(
+            STATICFILES_DIRS=[source], STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATIC_ROOT=self.static_root, STORAGES=storages,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_collectstatic_writes_hashed_and_precompressed_files(self):
+        hashed = staticfiles_storage.stored_name('css/leaf.css')
+        self.assertRegex(hashed, HASHED_NAME_RE)
+        for suffix in ('', '.gz'):
+            self.assertTrue(os.path.isfile(os.path.join(self.static_root, hashed + suffix)), hashed + suffix)
+        self.assertFalse(os.path.exists(os.path.join(self.static_root, 'scss')))
+
+    def test_middleware_serves_the_precompressed_variant(self):
+        hashed = staticfiles_storage.stored_name('css/leaf.css')
+        response = self.client.get(f'/static/{hashed}', headers={'accept-encoding': 'gzip'})
+        self.addCleanup(response.close)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        with open(os.path.join(self.static_root, hashed), 'rb') as original:
+            self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), original.read())
+
+
+# ===================================================================
+# LOAD GENERATOR
+# ===================================================================
+
+@override_settings(CACHES=TEST_CACHES)
+class LoadGeneratorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_generated_sorts_cover_the_shop_page(self):
+        create_products(5, 0)
+        self.assertEqual(set(loadgen.SORTS), {sort for sort, _ in SORT_LABELS})
+        for sort in loadgen.SORTS:
+            with self.subTest(sort=sort):
+                self.assertEqual(self.client.get('/shop/', {'sort': sort}).context['sort_option'], sort)
+
+    def test_mix_and_latency_histogram(self):
+        self.assertEqual(loadgen.parse_mix('browse=7,buy=2,reorder'), (['browse', 'buy', 'reorder'], [7.0, 2.0, 1.0]))
+        with self.assertRaises(ValueError):
+            loadgen.parse_mix('browse,window_shop=3')
+        stats = loadgen.LoadStats()
+        for elapsed_ms, ok in [(5, True), (10, True), (40, True), (9000, False)]:
+            stats.record('shop', elapsed_ms, ok)
+        self.assertEqual(stats.histogram('shop'), [2, 0, 1, 0, 0, 0, 0, 0, 0, 1])
+        self.assertEqual(stats.errors, {'shop': 1})
+
+
+# ===================================================================
+# URLCONF
+# ===================================================================
+
+class LazyViewTests(SimpleTestCase):
+    def test_declared_async_matches_each_view(self):
+        for pattern in import_module('shop.urls').urlpatterns:
+            route = pattern.callback
+            if route.__module__.startswith('shop.views.'):
+                view = getattr(import_module(route.__module__), route.__name__)
+                with self.subTest(view=route.__name__):
+                    self.assertEqual(iscoroutinefunction(route), iscoroutinefunction(view))
+
+    def test_loading_urlconf_imports_no_view_module(self):
+        probe = (
+            "import sys, django; django.setup(); from django.urls import get_resolver; "
+            "get_resolver().url_patterns; print(sorted(m for m in sys.modules if m.startswith('shop.views.')))"
+        )
+        result = subprocess.run([sys.executable, '-c', probe], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '[]')
@@ -1,5 +1,6 @@
 from django.urls import path
-from . import views
+from .views import lazy_view
+from .metrics import metrics_view
 
 # app_name = 'shop' # Optional: Add an app namespace for larger projects
 
@@ -7,45 +8,59 @@ urlpatterns = [
     # ===================================================================
     # Core & Static Page URLs
     # ===================================================================
-    path('', views.index, name='index'),
-    path('about/', views.about, name='about'),
-    path('contact/', views.contact, name='contact'),
+    path('', lazy_view('shop.views.core.index'), name='index'),
+    path('about/', lazy_view('shop.views.core.about'), name='about'),
+    path('contact/', lazy_view('shop.views.core.contact', is_async=True), name='contact'),
 
     # ===================================================================
     # Shop & Product URLs
     # ===================================================================
-    path('shop/', views.shop, name='shop'),
-    path('shop/product/<int:product_id>/', views.shop_details, name='shop_details'),
+    path('shop/', lazy_view('shop.views.catalog.shop'), name='shop'),
+    path('shop/product/<int:product_id>/', lazy_view('shop.views.catalog.shop_details'), name='shop_details'),
+    path('search/suggest/', lazy_view('shop.views.catalog.search_suggestions'), name='search_suggestions'),
 
     # ===================================================================
     # Cart & Coupon URLs
     # ===================================================================
-    path('cart/', views.cart_view, name='cart_view'),
-    path('cart/add/<int:product_id>/', views.add_to_cart, name='add_to_cart'),
-    path('cart/remove/<int:item_id>/', views.remove_from_cart, name='remove_from_cart'),
-    path('cart/update/', views.update_cart, name='update_cart'),
-    path('cart/apply-coupon/', views.apply_coupon, name='apply_coupon'),
+    path('cart/', lazy_view('shop.views.cart.cart_view'), name='cart_view'),
+    path('cart/add/<int:product_id>/', lazy_view('shop.views.cart.add_to_cart'), name='add_to_cart'),
+    path('cart/remove/<int:item_id>/', lazy_view('shop.views.cart.remove_from_cart'), name='remove_from_cart'),
+    path('cart/update/', lazy_view('shop.views.cart.update_cart'), name='update_cart'),
+    path('cart/apply-coupon/', lazy_view('shop.views.cart.apply_coupon'), name='apply_coupon'),
     
     # ===================================================================
     # Checkout & Order URLs
     # ===================================================================
-    path('checkout/', views.checkout, name='checkout'),
-    path('order/confirmation/<int:order_id>/', views.order_confirmation_view, name='order_confirmation'),
-    path('order/invoice/<int:order_id>/', views.generate_invoice_pdf, name='generate_invoice_pdf'),
+    path('checkout/', lazy_view('shop.views.orders.checkout'), name='checkout'),
+    path('order/confirmation/<int:order_id>/', lazy_view('shop.views.orders.order_confirmation_view'), name='order_confirmation'),
+    path('order/invoice/<int:order_id>/', lazy_view('shop.views.orders.generate_invoice_pdf', is_async=True), name='generate_invoice_pdf'),
 
     # ===================================================================
     # Authentication & Profile URLs
     # ===================================================================
-    path('login/', views.login_view, name='login_view'),
-    path('register/', views.register_view, name='register_view'),
-    path('logout/', views.logout_view, name='logout_view'),
-    path('profile/', views.profile_view, name='profile_view'),
-    path('profile/change-password/', views.change_password_view, name='change_password_view'), 
+    path('login/', lazy_view('shop.views.accounts.login_view'), name='login_view'),
+    path('register/', lazy_view('shop.views.accounts.register_view'), name='register_view'),
+    path('logout/', lazy_view('shop.views.accounts.logout_view'), name='logout_view'),
+    path('profile/', lazy_view('shop.views.accounts.profile_view'), name='profile_view'),
+    path('profile/change-password/', lazy_view('shop.views.accounts.change_password_view'), name='change_password_view'), 
+    path('profile/orders/', lazy_view('shop.views.accounts.order_history_more'), name='order_history_more'),
     
     # ===================================================================
     # Wishlist URLs
     # ===================================================================
-    path('wishlist/', views.view_wishlist, name='view_wishlist'),
-    path('wishlist/add/<int:product_id>/', views.add_to_wishlist, name='add_to_wishlist'),
-    path('wishlist/remove/<int:product_id>/', views.remove_from_wishlist, name='remove_from_wishlist'),
+    path('wishlist/', lazy_view('shop.views.wishlist.view_wishlist'), name='view_wishlist'),
+    path('wishlist/add/<int:product_id>/', lazy_view('shop.views.wishlist.add_to_wishlist', is_async=True), name='add_to_wishlist'),
+    path('wishlist/remove/<int:product_id>/', lazy_view('shop.views.wishlist.remove_from_wishlist', is_async=True), name='remove_from_wishlist'),
+
+    # ===================================================================
+    # Catalog API URLs
+    # ===================================================================
+    path('api/products/', lazy_view('shop.views.api.product_list'), name='api_product_list'),
+    path('api/products/feed.ndjson', lazy_view('shop.views.api.product_feed'), name='api_product_feed'),
+    path('api/products/<int:product_id>/', lazy_view('shop.views.api.product_detail'), name='api_product_detail'),
+
+    # ===================================================================
+    # Operations URLs
+    # ===================================================================
+    path('metrics/', metrics_view, name='metrics'),
 ]
\ No newline at end of file
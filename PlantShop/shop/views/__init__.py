@@ -0,0 +1,45 @@
+"""
+Views for the shop, split by area so each URL module only imports what it needs:
+
+- core: homepage, about and contact pages
+- catalog: shop listing and product details
+- cart: cart and coupon handling
+- orders: checkout, order confirmation and invoices
+- accounts: login, registration and profile
+- wishlist: wishlist pages and AJAX endpoints
+- api: read-only JSON catalog endpoints and the NDJSON product feed
+
+shop.urls routes to them through lazy_view(), so loading the URLconf imports none of
+these modules; each is imported by the first request to one of its views.
+"""
+from importlib import import_module
+
+from asgiref.sync import iscoroutinefunction
+from django.core.exceptions import ImproperlyConfigured
+
+
+def lazy_view(dotted_path, is_async=False):
+    """
+    Returns a view that imports `dotted_path` (e.g. 'shop.views.orders.checkout') on its first
+    call and delegates to it. Django picks the sync or async calling convention before the real
+    view is loaded, so async views must be declared with is_async=True.
+    """
+    module_path, name = dotted_path.rsplit('.', 1)
+    loaded = []
+
+    def load():
+        if not loaded:
+            view = getattr(import_module(module_path), name)
+            if iscoroutinefunction(view) != is_async:
+                raise ImproperlyConfigured(f"lazy_view({dotted_path!r}) needs is_async={not is_async}.")
+            loaded.append(view)
+        return loaded[0]
+
+    if is_async:
+        async def view(request, *args, **kwargs):
+            return await load()(request, *args, **kwargs)
+    else:
+        def view(request, *args, **kwargs):
+            return load()(request, *args, **kwargs)
+    view.__module__, view.__name__, view.__qualname__ = module_path, name, name
+    return view
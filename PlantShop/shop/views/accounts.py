@@ -0,0 +1,136 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+
+# Standard Django Imports
+from django.shortcuts import render, redirect
+from django.contrib import messages
+from django.contrib.auth import authenticate, login as auth_login, logout as auth_logout, update_session_auth_hash
+from django.contrib.auth.decorators import login_required
+from django.urls import reverse
+from django.http import JsonResponse
+from django.core.exceptions import ValidationError
+from django.contrib.auth.password_validation import validate_password
+from django.template.loader import render_to_string
+
+# Local App Imports
+from ..models import User
+from ..order_history import get_order_page, get_order_stats
+
+
+# ===================================================================
+# AUTH & PROFILE VIEWS
+# ===================================================================
+
+def login_view(request):
+    """Handles user login."""
+    if request.user.is_authenticated: return redirect('index')
+    if request.method == 'POST':
+        email = request.POST.get('email', '').strip()
+        password = request.POST.get('password', '')
+        user = authenticate(request, username=email, password=password)
+        if user is not None:
+            auth_login(request, user)
+            messages.success(request, f"Welcome back, {user.full_name}!")
+            return redirect('index')
+        else:
+            messages.error(request, "Invalid email or password.")
+    return render(request, 'login.html')
+
+
+def register_view(request):
+    """Handles new user registration with password validation."""
+    if request.user.is_authenticated: return redirect('index')
+    if request.method == 'POST':
+        password = request.POST.get('password')
+        if password != request.POST.get('confirm_password'):
+            messages.error(request, "Passwords do not match.")
+            return redirect('register_view')
+        try:
+            validate_password(password)
+        except ValidationError as e:
+            messages.error(request, ". ".join(e.messages))
+            return redirect('register_view')
+        
+        email = request.POST.get('email')
+        if User.objects.filter(email=email).exists():
+            messages.error(request, "An account with this email already exists.")
+            return redirect('register_view')
+
+        user = User.objects.create_user(
+            email=email, password=password, 
+            full_name=request.POST.get('full_name'), 
+            phone=request.POST.get('phone')
+        )
+        auth_login(request, user)
+        messages.success(request, f"Welcome, {user.full_name}! Your account has been created.")
+        return redirect('index')
+    return render(request, 'register.html')
+
+
+def logout_view(request):
+    """Logs the user out."""
+    auth_logout(request)
+    messages.success(request, "You have been logged out successfully.")
+    return redirect('login_view')
+
+
+@login_required(login_url='login_view')
+def profile_view(request):
+    """Displays user profile and handles detail updates."""
+    if request.method == 'POST':
+        user = request.user
+        password = request.POST.get('password')
+        redirect_url = f"{reverse('profile_view')}#details"
+        if not user.check_password(password):
+            messages.error(request, 'Incorrect password.')
+            return redirect(redirect_url)
+        new_email = request.POST.get('email')
+        if User.objects.filter(email=new_email).exclude(pk=user.pk).exists():
+            messages.error(request, 'An account with this email already exists.')
+            return redirect(redirect_url)
+        user.full_name = request.POST.get('full_name'); user.phone = request.POST.get('phone'); user.email = new_email
+        user.save()
+        messages.success(request, 'Your profile has been updated!')
+        return redirect('profile_view')
+    orders, next_cursor = get_order_page(request.user)
+    context = {'orders': orders, 'next_cursor': next_cursor, 'order_stats': get_order_stats(request.user.id)}
+    return render(request, 'profile.html', context)
+
+
+@login_required(login_url='login_view')
+def order_history_more(request):
+    """Returns the next page of order history rows as HTML for the AJAX "load more" button."""
+    before = request.GET.get('before', '')
+    if not before.isdigit():
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor.'}, status=400)
+    orders, next_cursor = get_order_page(request.user, before=int(before))
+    html = render_to_string('order_history_rows.html', {'orders': orders}, request=request)
+    return JsonResponse({'status': 'success', 'html': html, 'next_cursor': next_cursor})
+
+
+@login_required(login_url='login_view')
+def change_password_view(request):
+    """Handles secure password changes for logged-in users."""
+    if request.method == 'POST':
+        user = request.user
+        current_password = request.POST.get('current_password')
+        new_password = request.POST.get('new_password')
+        redirect_url = f"{reverse('profile_view')}#password"
+        if new_password != request.POST.get('confirm_password'):
+            messages.error(request, "New passwords do not match.")
+            return redirect(redirect_url)
+        if not user.check_password(current_password):
+            messages.error(request, "Your current password is not correct.")
+            return redirect(redirect_url)
+        try:
+            validate_password(new_password, user=user)
+        except ValidationError as e:
+            messages.error(request, ". ".join(e.messages))
+            return redirect(redirect_url)
+        user.set_password(new_password)
+        user.save()
+        update_session_auth_hash(request, user)
+        messages.success(request, "Your password has been changed successfully.")
+        return redirect('profile_view')
+    return redirect('profile_view')
@@ -0,0 +1,155 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+
+# Standard Django Imports
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_GET
+
+# Local App Imports
+from ..api import (
+    DETAIL_FIELDS, LIST_FIELDS, available_products, dumps, get_catalog_version, parse_fields, product_rows,
+)
+from ..sorting import IN_STOCK_SORTS, PRODUCT_SORTS, after_cursor, decode_cursor, encode_cursor, sort_ordering
+
+
+# ===================================================================
+# CATALOG API VIEWS
+# ===================================================================
+# Read-only JSON for the mobile app and price-comparison feeds. Every response
+# carries an ETag derived from the catalog version, so unchanged catalogs are
+# answered with a 304 before any product query runs.
+
+API_PAGE_SIZE = 24
+API_MAX_PAGE_SIZE = 100
+FEED_BATCH_SIZE = 500
+# Reversed in place of a product id, then swapped for each real id; no real host or path contains it
+FEED_URL_ID_PLACEHOLDER = 918273645546372819
+
+
+def catalog_etag(request, *args, **kwargs):
+    return f'"catalog-{get_catalog_version()}"'
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), content_type='application/json', status=status)
+
+
+def json_error(message, status):
+    return json_response({'status': 'error', 'message': message}, status=status)
+
+
+def _url_base(request):
+    """Scheme and host for absolute image URLs, e.g. https://leafcart.example."""
+    return request.build_absolute_uri('/')[:-1]
+
+
+def _int_param(request, name, default=None):
+    value = request.GET.get(name)
+    if value is None or value == '':
+        return default
+    return int(value)
+
+
+@require_GET
+@gzip_page
+@cache_control(public=True, max_age=60)
+@condition(etag_func=catalog_etag)
+def product_list(request):
+    """
+    Returns a page of products with a `next` URL to continue (keyset paging). Products are in
+    id order by default; ?sort= takes any shop sort (rating, reviews, bestseller, newest, ...).
+    """
+    fields = parse_fields(request.GET.get('fields'), LIST_FIELDS)
+    if fields is None:
+        return json_error("Unknown field requested.", 400)
+    sort = request.GET.get('sort') or None
+    if sort is not None and sort not in PRODUCT_SORTS:
+        return json_error(f"Unknown sort; choose from {', '.join(PRODUCT_SORTS)}.", 400)
+    try:
+        after = _int_param(request, 'after', 0)
+        limit = min(max(_int_param(request, 'limit', API_PAGE_SIZE), 1), API_MAX_PAGE_SIZE)
+        category = _int_param(request, 'category')
+        cursor = decode_cursor(sort, request.GET['cursor']) if sort and request.GET.get('cursor') else None
+    except ValueError:
+        return json_error("after, limit and category must be integers and cursor must come from a previous page.", 400)
+
+    products = available_products()
+    if category is not None:
+        products = products.filter(category_id=category)
+    if request.GET.get('in_stock') == '1' or sort in IN_STOCK_SORTS:
+        products = products.filter(stock__gt=0)
+    if sort is None:
+        products = products.filter(id__gt=after).order_by('id')
+        cursor_fields = ['id']
+    else:
+        products = products.order_by(*sort_ordering(sort))
+        if cursor is not None:
+            products = products.filter(after_cursor(sort, cursor))
+        cursor_fields = [field for field, _ in PRODUCT_SORTS[sort]]
+    # The sort columns are always read so the next cursor can be built, then dropped if not requested
+    hidden = [field for field in cursor_fields if field not in fields]
+    rows = product_rows(products[:limit], fields + hidden, _url_base(request))
+
+    next_url = None
+    if len(rows) == limit:
+        params = request.GET.copy()
+        if sort is None:
+            params['after'] = rows[-1]['id']
+        else:
+            params['cursor'] = encode_cursor(sort, rows[-1])
+        next_url = f"{request.path}?{params.urlencode()}"
+    for row in rows:
+        for field in hidden:
+            del row[field]
+    return json_response({'results': rows, 'next': next_url})
+
+
+@require_GET
+@gzip_page
+@cache_control(public=True, max_age=60)
+@condition(etag_func=catalog_etag)
+def product_detail(request, product_id):
+    """Returns one product with all fields by default, or the ones named in ?fields=."""
+    fields = parse_fields(request.GET.get('fields'), DETAIL_FIELDS)
+    if fields is None:
+        return json_error("Unknown field requested.", 400)
+    rows = product_rows(available_products().filter(id=product_id), fields, _url_base(request))
+    if not rows:
+        return json_error("Product not found.", 404)
+    return json_response(rows[0])
+
+
+def _feed_lines(fields, product_url, url_base):
+    """
+    Yields one JSON line per available product, reading the catalog in id-ordered batches.
+    `product_url` is the absolute detail URL reversed for FEED_URL_ID_PLACEHOLDER.
+    """
+    url_prefix, _, url_suffix = product_url.partition(str(FEED_URL_ID_PLACEHOLDER))
+    after = 0
+    while True:
+        rows = product_rows(available_products().filter(id__gt=after).order_by('id')[:FEED_BATCH_SIZE], fields, url_base)
+        if not rows:
+            return
+        after = rows[-1]['id']
+        for row in rows:
+            row['url'] = f"{url_prefix}{row['id']}{url_suffix}"
+            yield dumps(row) + b'\n'
+
+
+@require_GET
+@gzip_page
+@cache_control(public=True, max_age=300)
+@condition(etag_func=catalog_etag)
+def product_feed(request):
+    """Streams the whole available catalog as NDJSON for price-comparison crawlers."""
+    fields = parse_fields(request.GET.get('fields'), LIST_FIELDS)
+    if fields is None:
+        return json_error("Unknown field requested.", 400)
+    if 'id' not in fields:
+        fields = ['id'] + fields
+    product_url = request.build_absolute_uri(reverse('shop_details', args=[FEED_URL_ID_PLACEHOLDER]))
+    return StreamingHttpResponse(_feed_lines(fields, product_url, _url_base(request)), content_type='application/x-ndjson')
@@ -0,0 +1,110 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+
+# Standard Django Imports
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+
+# Local App Imports
+from ..models import Product, CartItem, Coupon
+from ..session import get_coupon_id, set_coupon, clear_coupon
+from ..inventory import available_quantity
+
+
+# ===================================================================
+# CART & COUPON VIEWS
+# ===================================================================
+
+@login_required(login_url='login_view')
+def cart_view(request):
+    """Renders the shopping cart page with totals and coupon info."""
+    cart_items = CartItem.objects.filter(user=request.user).select_related('product')
+    cart_subtotal = sum(item.get_total for item in cart_items)
+    discount_amount = 0; final_total = cart_subtotal; coupon_code = None; coupon_discount_percent = 0
+    
+    coupon_id = get_coupon_id(request.session)
+    if coupon_id:
+        try:
+            coupon = Coupon.objects.get(id=coupon_id, is_active=True)
+            discount_amount = (cart_subtotal * coupon.discount_percent) / 100
+            final_total = cart_subtotal - discount_amount
+            coupon_code = coupon.code; coupon_discount_percent = coupon.discount_percent
+        except Coupon.DoesNotExist:
+            clear_coupon(request.session)
+
+    context = {
+        'cart_items': cart_items, 'cart_subtotal': cart_subtotal, 'discount_amount': discount_amount,
+        'final_total': final_total, 'coupon_code': coupon_code, 'coupon_discount_percent': coupon_discount_percent,
+    }
+    return render(request, 'cart.html', context)
+
+
+@login_required(login_url='login_view')
+def add_to_cart(request, product_id):
+    """Handles adding a product to the cart or updating its quantity, then redirects."""
+    product = get_object_or_404(Product, id=product_id)
+    # The row was just read, so it is fresher than this worker's stock snapshot
+    available = product.stock if product.is_available else 0
+    if available <= 0:
+        messages.error(request, f"Sorry, '{product.name}' is out of stock.")
+        return redirect('shop')
+    
+    quantity_from_form = int(request.POST.get('quantity', 1))
+    cart_item, created = CartItem.objects.get_or_create(user=request.user, product=product)
+
+    if created:
+        cart_item.quantity = quantity_from_form
+        messages.success(request, f"'{product.name}' was added to your cart.")
+    else:
+        cart_item.quantity += quantity_from_form
+        messages.success(request, f"Quantity of '{product.name}' was updated.")
+    if cart_item.quantity > available:
+        cart_item.quantity = available
+        messages.warning(request, f"Only {available} of '{product.name}' are in stock, so your cart holds {available}.")
+    
+    cart_item.save()
+    return redirect('cart_view')
+
+
+@login_required(login_url='login_view')
+def remove_from_cart(request, item_id):
+    """Removes a single item from the cart."""
+    get_object_or_404(CartItem, id=item_id, user=request.user).delete()
+    messages.success(request, "Item removed from cart.")
+    return redirect('cart_view')
+
+
+@login_required(login_url='login_view')
+def update_cart(request):
+    """Updates quantities for all items in the cart from the cart page form."""
+    if request.method == 'POST':
+        for key, value in request.POST.items():
+            if key.startswith('quantity_'):
+                try:
+                    item_id = int(key.split('_')[1]); quantity = int(value)
+                    item = get_object_or_404(CartItem, id=item_id, user=request.user)
+                    if quantity > 0:
+                        item.quantity = min(quantity, max(available_quantity(item.product_id, quantity), 1))
+                        item.save()
+                    else:
+                        item.delete()
+                except (ValueError, CartItem.DoesNotExist):
+                    continue
+        messages.success(request, "Cart updated.")
+    return redirect('cart_view')
+
+
+def apply_coupon(request):
+    """Applies a coupon code to the user's session."""
+    if request.method == 'POST':
+        code = request.POST.get('code')
+        try:
+            coupon = Coupon.objects.get(code__iexact=code, is_active=True)
+            set_coupon(request.session, coupon.id)
+            messages.success(request, 'Coupon applied successfully!')
+        except Coupon.DoesNotExist:
+            clear_coupon(request.session)
+            messages.error(request, 'This coupon is invalid or has expired.')
+    return redirect('cart_view')
@@ -0,0 +1,122 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+
+# Standard Django Imports
+from urllib.parse import urlencode
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.core.exceptions import ValidationError
+from django.db.models import Q, Case, When, Value, BooleanField, OuterRef, Subquery
+
+# Local App Imports
+from ..models import Product, ProductImage, Category, Wishlist
+from ..recommendations import get_related_products
+from ..facets import FacetSelection, build_facets
+from ..reviews import REVIEWS_PER_PAGE, approved_reviews, submit_review
+from ..sorting import PRODUCT_SORTS, IN_STOCK_SORTS, SORT_LABELS, sort_ordering
+from ..suggestions import get_suggestion_index
+
+
+# ===================================================================
+# SHOP & PRODUCT VIEWS
+# ===================================================================
+
+def shop(request):
+    """Renders the main shop page with faceted filtering, searching, sorting, and pagination."""
+    categories = Category.objects.filter(is_active=True)
+    selection = FacetSelection.from_query(request.GET)
+    search_query = request.GET.get('search', None)
+    sort_option = request.GET.get('sort', 'default')
+    if sort_option not in PRODUCT_SORTS:
+        sort_option = 'default'
+    # "Newest in stock" lists in-stock products only; the sort form keeps the shopper's own filters
+    listing = selection.toggled('in_stock') if sort_option in IN_STOCK_SORTS and not selection.in_stock else selection
+
+    products_list = Product.objects.filter(listing.as_q())
+
+    search_ids = None
+    if search_query:
+        search_filter = Q(name__icontains=search_query) | Q(description__icontains=search_query)
+        products_list = products_list.filter(search_filter)
+        search_ids = Product.objects.filter(search_filter).values_list('id', flat=True)
+
+    if sort_option in PRODUCT_SORTS:
+        products_list = products_list.order_by(*sort_ordering(sort_option))
+    else:
+        # In-stock products first, then newest; stock quantity itself does not affect placement
+        in_stock = Case(When(stock__gt=0, is_available=True, then=Value(True)), default=Value(False), output_field=BooleanField())
+        products_list = products_list.order_by(in_stock.desc(), '-created_at', '-id')
+    # The card image comes from a subquery, so each page of products is a single query
+    first_image = ProductImage.objects.filter(product=OuterRef('pk')).order_by('id').values('image')[:1]
+    products_list = products_list.annotate(first_image=Subquery(first_image))
+
+    wishlist_product_ids = []
+    if request.user.is_authenticated:
+        wishlist_product_ids = set(Wishlist.objects.filter(user=request.user).values_list('product_id', flat=True))
+
+    # Search and sort are kept on every facet and pagination link
+    extra_params = []
+    if search_query:
+        extra_params.append(('search', search_query))
+    if sort_option != 'default':
+        extra_params.append(('sort', sort_option))
+    facets, _ = build_facets(listing, categories, search_ids=search_ids, extra_params=extra_params)
+
+    # The paginator runs its own COUNT: the facet index total can trail a change made in another worker
+    paginator = Paginator(products_list, 6)
+    page_number = request.GET.get("page")
+    page_obj = paginator.get_page(page_number)
+
+    context = {
+        "categories": categories, "page_obj": page_obj, "selected_categories": selection.categories,
+        "search_query": search_query, "sort_option": sort_option, "wishlist_product_ids": wishlist_product_ids,
+        "facets": facets, "filter_params": selection.query_params(), "sort_labels": SORT_LABELS,
+        "filter_query": urlencode(extra_params + selection.query_params()),
+    }
+    return render(request, "shop.html", context)
+
+
+@require_GET
+def search_suggestions(request):
+    """Returns product and category names matching the typed prefix, from the in-memory index."""
+    products, categories = get_suggestion_index().suggest(request.GET.get('q', '')[:100])
+    shop_url = reverse('shop')
+    response = JsonResponse({
+        'products': [{'id': pid, 'name': name, 'url': reverse('shop_details', args=[pid])} for pid, name in products],
+        'categories': [{'id': cid, 'name': name, 'url': f"{shop_url}?categories={cid}"} for cid, name in categories],
+    })
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
+
+
+def shop_details(request, product_id):
+    """Renders the product detail page and handles review submission."""
+    product = get_object_or_404(Product.objects.select_related('recommendation'), id=product_id)
+    if request.method == "POST" and request.user.is_authenticated:
+        try:
+            _, created = submit_review(product, request.user, request.POST.get("rating"), request.POST.get("comment"))
+        except ValidationError as e:
+            messages.error(request, e.messages[0])
+        else:
+            messages.success(request, "Your review has been submitted." if created else "Your review has been updated.")
+        return redirect("shop_details", product_id=product.id)
+
+    product_images = product.images.all()
+    related_products = get_related_products(product)
+
+    is_in_wishlist = False
+    if request.user.is_authenticated:
+        is_in_wishlist = Wishlist.objects.filter(user=request.user, product=product).exists()
+
+    reviews_page = Paginator(approved_reviews(product), REVIEWS_PER_PAGE).get_page(request.GET.get("reviews_page"))
+    context = {
+        "product": product, "product_images": product_images, "related_products": related_products,
+        "is_in_wishlist": is_in_wishlist, "reviews_page": reviews_page,
+    }
+    return render(request, "shop_details.html", context)
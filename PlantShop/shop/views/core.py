@@ -0,0 +1,52 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+
+# Standard Django Imports
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect
+from django.contrib import messages
+
+# Local App Imports
+from ..models import Product, Category, ProductImage
+from ..contact_queue import enqueue_contact, is_rate_limited
+from ..ratelimit import client_ip
+
+
+# ===================================================================
+# CORE & STATIC PAGE VIEWS
+# ===================================================================
+
+def index(request):
+    """Renders the homepage with featured categories and new arrival products."""
+    new_arrivals = Product.objects.filter(is_available=True, stock__gt=0).order_by('-created_at')[:4]
+    featured_categories = Category.objects.filter(is_active=True)[:3]
+    context = {'new_arrivals': new_arrivals, 'featured_categories': featured_categories}
+    return render(request, 'index.html', context)
+
+
+def about(request):
+    """Renders the about page with a random gallery of plant images."""
+    all_images = ProductImage.objects.order_by('?')[:12]
+    context = {'plant_images': all_images}
+    return render(request, 'about.html', context)
+
+
+async def contact(request):
+    """Handles the contact form submission. Messages are rate limited and written in batches."""
+    if request.method == "POST":
+        name = request.POST.get('name')
+        email = request.POST.get('email')
+        subject = request.POST.get('subject')
+        message_text = request.POST.get('message')
+        if not all([name, email, subject, message_text]):
+            messages.error(request, "All fields are required.")
+        elif is_rate_limited(client_ip(request), email):
+            messages.error(request, "You have sent too many messages. Please try again later.")
+        elif not enqueue_contact(name, email, subject, message_text):
+            messages.error(request, "We are receiving a lot of messages right now. Please try again shortly.")
+        else:
+            messages.success(request, "Thank you for your message!")
+            return redirect('contact')
+    # Context processors query the ORM synchronously, so the page itself is rendered in a thread.
+    return await sync_to_async(render)(request, 'contact.html')
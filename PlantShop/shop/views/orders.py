@@ -0,0 +1,99 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+
+# Standard Django Imports
+from django.shortcuts import render, redirect
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.http import Http404, HttpResponse
+
+# Local App Imports
+from ..models import CartItem, Order, OrderItem, Coupon
+from ..invoices import invoice_orders, archived_invoice_orders, arender_invoice, invoice_filename
+from ..order_history import get_user_order, aget_user_order
+from ..session import get_coupon_id, clear_coupon
+from ..inventory import InsufficientStock, available_quantity, decrement_stock
+
+
+# ===================================================================
+# CHECKOUT & ORDER VIEWS
+# ===================================================================
+
+@login_required(login_url='login_view')
+def checkout(request):
+    """Handles the final checkout process, including stock validation and order creation."""
+    cart_items = CartItem.objects.filter(user=request.user).select_related('product')
+    cart_subtotal = sum(item.get_total for item in cart_items)
+    if not cart_items:
+        messages.warning(request, "Your cart is empty.")
+        return redirect('shop')
+
+    discount_amount = 0; final_total = cart_subtotal
+    coupon_id = get_coupon_id(request.session)
+    if coupon_id:
+        try:
+            coupon = Coupon.objects.get(id=coupon_id)
+            discount_amount = (cart_subtotal * coupon.discount_percent) / 100
+            final_total = cart_subtotal - discount_amount
+        except Coupon.DoesNotExist:
+            clear_coupon(request.session)
+            coupon_id = None
+
+    if request.method == 'POST':
+        for item in cart_items:
+            if available_quantity(item.product_id, item.quantity) < item.quantity:
+                messages.error(request, f"Sorry, '{item.product.name}' is out of stock.")
+                return redirect('cart_view')
+
+        try:
+            with transaction.atomic():
+                new_order = Order.objects.create(
+                    user=request.user, full_name=request.POST.get('full_name'),
+                    email=request.POST.get('email'), phone=request.POST.get('phone'),
+                    address=request.POST.get('address'), city=request.POST.get('city'),
+                    state=request.POST.get('state'), postcode=request.POST.get('postcode'),
+                    total_price=final_total, payment_method='Cash on Delivery'
+                )
+                OrderItem.objects.bulk_create([
+                    OrderItem(order=new_order, product=item.product, quantity=item.quantity, price=item.product.price)
+                    for item in cart_items
+                ])
+                # The snapshot can lag a concurrent checkout; the conditional UPDATEs are authoritative
+                decrement_stock({item.product_id: item.quantity for item in cart_items})
+        except InsufficientStock as e:
+            name = next(item.product.name for item in cart_items if item.product_id == e.product_id)
+            messages.error(request, f"Sorry, '{name}' is out of stock.")
+            return redirect('cart_view')
+
+        cart_items.delete()
+        clear_coupon(request.session)
+        
+        messages.success(request, "Your order has been placed successfully!")
+        return redirect('order_confirmation', order_id=new_order.id)
+
+    context = {'cart_items': cart_items, 'cart_subtotal': cart_subtotal, 'discount_amount': discount_amount, 'final_total': final_total, 'coupon_code': coupon.code if coupon_id else None}
+    return render(request, 'checkout.html', context)
+
+
+@login_required(login_url='login_view')
+def order_confirmation_view(request, order_id):
+    """Displays the "Thank You" page after a successful order."""
+    order = get_user_order(request.user, order_id)
+    if order is None:
+        raise Http404("No such order.")
+    return render(request, 'order_confirmation.html', {'order': order})
+
+
+@login_required(login_url='login_view')
+async def generate_invoice_pdf(request, order_id):
+    """Generates a PDF invoice for a given order, rendering it on the invoice thread pool."""
+    user = await request.auser()
+    order = await aget_user_order(user, order_id, invoice_orders(), archived_invoice_orders())
+    if order is None:
+        raise Http404("No such order.")
+    pdf_file = await arender_invoice(order)
+    response = HttpResponse(pdf_file, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{invoice_filename(order)}"'
+    return response
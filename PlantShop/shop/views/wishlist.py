@@ -0,0 +1,47 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+
+# Standard Django Imports
+from django.shortcuts import render, redirect, aget_object_or_404
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+
+# Local App Imports
+from ..models import Product, Wishlist
+
+
+# ===================================================================
+# WISHLIST VIEWS
+# ===================================================================
+
+@login_required(login_url='login_view')
+def view_wishlist(request):
+    """Displays all items in the user's wishlist."""
+    wishlist_items = Wishlist.objects.filter(user=request.user).select_related('product')
+    return render(request, 'wishlist.html', {'wishlist_items': wishlist_items})
+
+
+@login_required(login_url='login_view')
+async def add_to_wishlist(request, product_id):
+    """Adds a product to the user's wishlist, handles AJAX."""
+    user = await request.auser()
+    product = await aget_object_or_404(Product, id=product_id)
+    await Wishlist.objects.aget_or_create(user=user, product=product)
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'status': 'success'})
+    messages.success(request, f"'{product.name}' has been added to your wishlist.")
+    return redirect(request.META.get('HTTP_REFERER', 'shop'))
+
+
+@login_required(login_url='login_view')
+async def remove_from_wishlist(request, product_id):
+    """Removes a product from the user's wishlist, handles AJAX."""
+    user = await request.auser()
+    product = await aget_object_or_404(Product, id=product_id)
+    await Wishlist.objects.filter(user=user, product=product).adelete()
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'status': 'success'})
+    messages.success(request, f"'{product.name}' has been removed from your wishlist.")
+    return redirect('view_wishlist')
@@ -0,0 +1,177 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Product, ProductAlert, Wishlist
+from .workers import BatchWorker
+from . import metrics
+
+
+# ===================================================================
+# WISHLIST ALERTS
+# ===================================================================
+# Saving a product that came back in stock or got cheaper queues a ProductAlert.
+# A background worker claims pending alerts, walks the Wishlist (product, user)
+# index in chunks and sends each wishing user one email covering every alerted
+# product on their wishlist, all over a single mail connection. Alerts are
+# marked processed only after the emails go out; if sending fails the claim is
+# released, and a claim left behind by a crashed run expires, so the
+# `send_wishlist_alerts` command (run from cron) retries them either way.
+# Delivery is at least once: users whose email went out before a failure may
+# get it again on the retry.
+
+ALERT_CHUNK_SIZE = getattr(settings, 'WISHLIST_ALERT_CHUNK_SIZE', 500)
+# A product flapping in and out of stock alerts its wishers at most once per window
+ALERT_COOLDOWN = timedelta(hours=getattr(settings, 'WISHLIST_ALERT_COOLDOWN_HOURS', 24))
+# A claim older than this belongs to a run that died mid-delivery, and may be taken over
+ALERT_CLAIM_TIMEOUT = timedelta(minutes=getattr(settings, 'WISHLIST_ALERT_CLAIM_TIMEOUT_MINUTES', 15))
+
+
+def is_buyable(is_available, stock):
+    return is_available and stock > 0
+
+
+def alert_kinds(previous, product):
+    """Which alerts a save from `previous` (a dict of the stored row) to `product` triggers."""
+    if not is_buyable(product.is_available, product.stock):
+        return []
+    kinds = []
+    if not is_buyable(previous['is_available'], previous['stock']):
+        kinds.append(ProductAlert.BACK_IN_STOCK)
+    if product.price < previous['price']:
+        kinds.append(ProductAlert.PRICE_DROP)
+    return kinds
+
+
+def enqueue_alert(product, kind, old_price=None):
+    """
+    Queues an alert unless one for the same product and kind is still pending or was raised
+    within the cooldown. Delivery starts once the surrounding transaction commits.
+    """
+    recent = Q(processed_at__isnull=True) | Q(created_at__gte=timezone.now() - ALERT_COOLDOWN)
+    if ProductAlert.objects.filter(recent, product=product, kind=kind).exists():
+        return None
+    alert = ProductAlert.objects.create(product=product, kind=kind, old_price=old_price)
+    transaction.on_commit(schedule_delivery)
+    return alert
+
+
+def product_saved(product, previous):
+    """Queues the alerts for one product save; `previous` is None for a new product."""
+    if previous is None:
+        return
+    for kind in alert_kinds(previous, product):
+        enqueue_alert(product, kind, old_price=previous['price'] if kind == ProductAlert.PRICE_DROP else None)
+
+
+# --- Delivery ---
+
+def claim_pending_alerts():
+    """
+    Claims pending alerts for this delivery run, one conditional UPDATE each, and returns those
+    this caller won. Claimed alerts stay pending until complete_alerts() marks them processed.
+    """
+    now = timezone.now()
+    unclaimed = Q(processed_at__isnull=True) & (Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - ALERT_CLAIM_TIMEOUT))
+    claimed = []
+    for alert in ProductAlert.objects.filter(unclaimed).order_by('id'):
+        if ProductAlert.objects.filter(unclaimed, id=alert.id).update(claimed_at=now):
+            claimed.append(alert)
+    return claimed
+
+
+def complete_alerts(alert_ids):
+    ProductAlert.objects.filter(id__in=alert_ids).update(processed_at=timezone.now())
+
+
+def release_alerts(alert_ids):
+    """Hands claimed alerts back to the queue so the next run retries them."""
+    ProductAlert.objects.filter(id__in=alert_ids).update(claimed_at=None)
+
+
+def build_message(email, full_name, alerts, products):
+    lines = [(alert, products[alert.product_id]) for alert in alerts]
+    if len(lines) == 1:
+        alert, product = lines[0]
+        if alert.kind == ProductAlert.BACK_IN_STOCK:
+            subject = f"{product.name} is back in stock"
+        else:
+            subject = f"{product.name} is now ₹{product.price}"
+    else:
+        subject = f"{len(lines)} items on your wishlist have good news"
+    body = render_to_string('wishlist_alert_email.txt', {'full_name': full_name, 'lines': lines, 'site_url': getattr(settings, 'SITE_URL', '')})
+    return EmailMessage(subject, body, to=[email])
+
+
+def deliver_pending_alerts(chunk_size=ALERT_CHUNK_SIZE):
+    """
+    Sends every pending alert. A user wishing for several alerted products gets one message.
+    Returns the number of messages sent. If sending fails, the alerts are released for the
+    next run and the error is raised.
+    """
+    alerts = claim_pending_alerts()
+    if not alerts:
+        return 0
+    products = Product.objects.in_bulk({alert.product_id for alert in alerts})
+    alerts_by_product, stale = {}, []
+    for alert in alerts:
+        product = products.get(alert.product_id)
+        if product is not None and is_buyable(product.is_available, product.stock):
+            alerts_by_product.setdefault(alert.product_id, []).append(alert)
+        else:
+            stale.append(alert.id)
+    if stale:
+        # Sold out or hidden again before delivery; dropped so they don't hold the cooldown
+        ProductAlert.objects.filter(id__in=stale).delete()
+    if not alerts_by_product:
+        return 0
+
+    wishes = (
+        Wishlist.objects.filter(product_id__in=list(alerts_by_product), user__is_active=True)
+        .order_by('user_id', 'product_id')
+        .values_list('user_id', 'user__email', 'user__full_name', 'product_id')
+    )
+    alert_ids = [alert.id for product_alerts in alerts_by_product.values() for alert in product_alerts]
+    sent = 0
+    batch = []
+    try:
+        # One connection (one SMTP session) for the whole run instead of one per message
+        with get_connection() as connection:
+            for _, rows in groupby(wishes.iterator(chunk_size=chunk_size), key=itemgetter(0)):
+                rows = list(rows)
+                user_alerts = [alert for row in rows for alert in alerts_by_product[row[3]]]
+                batch.append(build_message(rows[0][1], rows[0][2], user_alerts, products))
+                if len(batch) >= chunk_size:
+                    sent += connection.send_messages(batch) or 0
+                    batch = []
+            if batch:
+                sent += connection.send_messages(batch) or 0
+    except Exception:
+        release_alerts(alert_ids)
+        raise
+    finally:
+        metrics.increment('leafcart_wishlist_alert_emails_total', "Wishlist alert emails sent.", sent)
+    complete_alerts(alert_ids)
+    return sent
+
+
+alert_worker = BatchWorker(
+    'wishlist-alerts', lambda batch: deliver_pending_alerts(),
+    batch_size=100, flush_interval=getattr(settings, 'WISHLIST_ALERT_FLUSH_INTERVAL', 5.0), max_queue_size=1000,
+)
+metrics.register_gauge('leafcart_wishlist_alert_queue_depth', "Wishlist alert deliveries waiting to run.", lambda: alert_worker.depth)
+
+
+def schedule_delivery():
+    """Wakes the delivery worker. If its queue is full a delivery is already due, which picks this alert up."""
+    alert_worker.put(True)
@@ -0,0 +1,101 @@
+# ===================================================================
+# IMPORTS
+# ===================================================================
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+# ===================================================================
+# BACKGROUND BATCH WORKER
+# ===================================================================
+
+class BatchWorker:
+    """
+    An in-process queue drained by a daemon thread that hands items to `flush` in batches.
+    A batch is flushed when it reaches `batch_size` items or `flush_interval` seconds have passed.
+    Whatever is still queued is flushed when the process exits.
+    """
+    def __init__(self, name, flush, batch_size=100, flush_interval=1.0, max_queue_size=10000):
+        self.name = name
+        self.flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def depth(self):
+        """Approximate number of items waiting to be flushed."""
+        return self.queue.qsize()
+
+    def put(self, item):
+        """Enqueues an item without blocking. Returns False if the queue is full."""
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            return False
+        return True
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.drain)
+
+    def _take_batch(self, timeout):
+        """Blocks for the first item, then collects up to a full batch without waiting further."""
+        try:
+            batch = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch):
+        try:
+            self.flush(batch)
+        except Exception:
+            logger.exception("%s failed to flush %d items", self.name, len(batch))
+        finally:
+            close_old_connections()
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(timeout=None)
+            if batch:
+                self._flush(batch)
+
+    def drain(self):
+        """Flushes everything currently queued on the calling thread."""
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)